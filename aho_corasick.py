@@ -0,0 +1,216 @@
+"""Aho–Corasick automaton for languages over several patterns at once.
+
+The trie of patterns P1..Pk, completed with failure links into a DFA over
+{a, b}, reads a word once and reports which patterns occur in it, however
+many patterns there are.  Each state carries the set of patterns ending
+there as a bitmask (bit i for Pi), so
+
+    contains any of P1..Pk    a state with a non-zero mask was reached
+    contains none of them     the complement
+    contains all of them      the union of the masks seen is all ones
+
+and the three languages also have DFAs (states are trie nodes, paired with
+the mask seen so far for "contains all") that state elimination turns into
+expressions.
+"""
+import sys
+from array import array
+
+from automata import ALPHABET, DFA, MAX_STATES, complement, minimize, to_expression
+from model import RegexStrategy
+from tasks import checkpoint
+
+
+class AhoCorasick:
+    """Multi-pattern matcher over {a, b}.
+
+    ``table`` is laid out like DFA.table over the trie nodes, with node 0
+    the root; ``outputs[node]`` is the bitmask of patterns that end at node,
+    including those that end at a proper suffix of it.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        for pattern in self.patterns:
+            if pattern.strip(ALPHABET):
+                raise ValueError(f"Pattern '{pattern}' may only use the symbols a and b")
+        self.full = (1 << len(self.patterns)) - 1
+
+        # The trie, with -1 for missing children
+        children = [-1, -1]
+        outputs = [0]
+        for bit, pattern in enumerate(self.patterns):
+            node = 0
+            for code in pattern.encode("ascii"):
+                index = 2 * node + code - 97
+                if children[index] < 0:
+                    children[index] = len(outputs)
+                    children.extend((-1, -1))
+                    outputs.append(0)
+                node = children[index]
+            outputs[node] |= 1 << bit
+
+        # Breadth-first, each node's failure target is finished before it,
+        # so missing children can borrow the failure target's transition
+        table = array("l", children)
+        fail = [0] * len(outputs)
+        queue = []
+        for column in (0, 1):
+            child = children[column]
+            if child < 0:
+                table[column] = 0
+            else:
+                queue.append(child)
+        for node in queue:
+            outputs[node] |= outputs[fail[node]]
+            for column in (0, 1):
+                child = children[2 * node + column]
+                if child < 0:
+                    table[2 * node + column] = table[2 * fail[node] + column]
+                else:
+                    fail[child] = table[2 * fail[node] + column]
+                    queue.append(child)
+        self.table = table
+        self.outputs = outputs
+
+    @property
+    def num_states(self):
+        return len(self.outputs)
+
+    def memory_size(self):
+        return (sys.getsizeof(self.table) + sys.getsizeof(self.outputs)
+                + sum(map(sys.getsizeof, self.outputs)))
+
+    def occurring(self, word):
+        """Return the bitmask of patterns that occur in word, in one pass
+        that stops as soon as every pattern has been seen"""
+        if word.strip(ALPHABET):
+            return 0  # Symbols outside {a, b}
+        table = self.table
+        outputs = self.outputs
+        full = self.full
+        mask = outputs[0]  # The empty pattern occurs everywhere
+        if mask == full:
+            return mask
+        state = 0
+        for code in word.encode("ascii"):
+            state = table[2 * state + code - 97]
+            found = outputs[state]
+            if found:
+                mask |= found
+                if mask == full:
+                    break
+        return mask
+
+    def contains_any(self, word):
+        if word.strip(ALPHABET):
+            return False
+        if self.outputs[0]:
+            return True  # The empty pattern occurs everywhere
+        table = self.table
+        outputs = self.outputs
+        state = 0
+        for code in word.encode("ascii"):
+            state = table[2 * state + code - 97]
+            if outputs[state]:
+                return True
+        return False
+
+    def contains_all(self, word):
+        if word.strip(ALPHABET):
+            return False
+        return self.occurring(word) == self.full
+
+    def contains_none(self, word):
+        if word.strip(ALPHABET):
+            return False
+        return not self.contains_any(word)
+
+    def any_automaton(self):
+        """Return the DFA of the words containing at least one pattern"""
+        table = array("l", self.table)
+        accepting = bytearray(bool(found) for found in self.outputs)
+        for node, final in enumerate(accepting):
+            if final:
+                # Once a pattern has been seen the word is in, whatever follows
+                table[2 * node] = table[2 * node + 1] = node
+        return DFA(table, accepting)
+
+    def all_automaton(self, max_states=MAX_STATES):
+        """Return the DFA of the words containing every pattern.
+
+        States are the reachable pairs (trie node, mask of patterns seen),
+        with every pair whose mask is full merged into one accepting sink.
+        Raises ValueError beyond max_states states.
+        """
+        table = self.table
+        outputs = self.outputs
+        full = self.full
+        sink = (-1, full)
+
+        def pair(node, mask):
+            return sink if mask == full else (node, mask)
+
+        start = pair(0, outputs[0])
+        number = {start: 0}
+        pairs = [start]
+        dfa_table = array("l")
+        accepting = bytearray()
+        for position, (node, mask) in enumerate(pairs):
+            if not (position + 1) % 1024:
+                checkpoint()
+            if node < 0:
+                accepting.append(1)
+                dfa_table.extend((position, position))
+                continue
+            accepting.append(0)
+            for column in (0, 1):
+                target = table[2 * node + column]
+                key = pair(target, mask | outputs[target])
+                index = number.get(key)
+                if index is None:
+                    if len(pairs) >= max_states:
+                        raise ValueError(f"The automaton needs more than {max_states} states")
+                    index = number[key] = len(pairs)
+                    pairs.append(key)
+                dfa_table.append(index)
+        return DFA(dfa_table, accepting)
+
+
+class _MultiPatternStrategy(RegexStrategy):
+    # The arguments are the patterns
+
+    def build_expression(self, *patterns):
+        return to_expression(minimize(self.build_automaton(*patterns)))
+
+
+class ContainsAnyStrategy(_MultiPatternStrategy):
+    def build_automaton(self, *patterns):
+        return AhoCorasick(patterns).any_automaton()
+
+    def get_description(self, *patterns):
+        return "contains at least one of " + ", ".join(f"'{pattern}'" for pattern in patterns)
+
+
+class ContainsAllStrategy(_MultiPatternStrategy):
+    def build_automaton(self, *patterns):
+        return AhoCorasick(patterns).all_automaton()
+
+    def get_description(self, *patterns):
+        return "contains all of " + ", ".join(f"'{pattern}'" for pattern in patterns)
+
+
+class ContainsNoneStrategy(_MultiPatternStrategy):
+    def build_automaton(self, *patterns):
+        return complement(AhoCorasick(patterns).any_automaton())
+
+    def get_description(self, *patterns):
+        return "contains none of " + ", ".join(f"'{pattern}'" for pattern in patterns)
+
+
+# Strategy for each kind of multi-pattern language
+STRATEGY_CLASSES = {
+    "any": ContainsAnyStrategy,
+    "all": ContainsAllStrategy,
+    "none": ContainsNoneStrategy,
+}
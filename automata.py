@@ -0,0 +1,640 @@
+"""Finite automata for the languages described by regex_ast expressions.
+
+An expression is compiled with Thompson's construction into an NFA and then
+determinised by subset construction into a table-driven DFA.  Matching a
+word against the DFA is one table lookup per symbol, with no backtracking.
+"""
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from regex_ast import EMPTY, EPSILON, Concat, Empty, Epsilon, Power, Star, Symbol, Union, concat, star, union
+from tasks import checkpoint
+
+ALPHABET = "ab"
+
+# Subset construction stops with a ValueError beyond this many states
+MAX_STATES = 1_000_000
+
+# match_many() steps eight symbols per lookup for automata up to this size
+BLOCK_TABLE_STATES = 4096
+
+_BITS = str.maketrans(ALPHABET, "01")
+
+
+class DFA:
+    """Complete deterministic automaton over {a, b}.
+
+    ``table[2 * state + symbol]`` is the successor of ``state``, where symbol
+    0 is 'a' and 1 is 'b'.  ``accepting[state]`` is 1 for final states.
+    """
+    __slots__ = ("table", "accepting", "start", "_blocks")
+
+    def __init__(self, table, accepting, start=0):
+        self.table = table
+        self.accepting = accepting
+        self.start = start
+        self._blocks = None
+
+    def __reduce__(self):
+        return DFA, (self.table, self.accepting, self.start)
+
+    @property
+    def num_states(self):
+        return len(self.accepting)
+
+    def memory_size(self):
+        """Approximate bytes held by the automaton, including the block
+        table match_many() builds on first use for automata small enough"""
+        size = sys.getsizeof(self.table) + sys.getsizeof(self.accepting)
+        if self._blocks is not None:
+            size += sys.getsizeof(self._blocks)
+        elif self.num_states <= BLOCK_TABLE_STATES:
+            size += 256 * self.num_states * self.table.itemsize
+        return size
+
+    def step(self, state, char):
+        return self.table[2 * state + ALPHABET.index(char)]
+
+    def matches(self, word):
+        """Return True if word is in the language, in O(len(word)) time"""
+        if word.strip(ALPHABET):
+            return False  # Symbols outside {a, b}
+
+        table = self.table
+        state = self.start
+        # 'a' and 'b' are code points 97 and 98
+        for code in word.encode("ascii"):
+            state = table[2 * state + code - 97]
+        return bool(self.accepting[state])
+
+    def block_table(self):
+        """Return the successor table for blocks of eight symbols.
+
+        ``blocks[256 * state + byte]`` is the state reached from ``state``
+        after reading the eight symbols encoded in byte, most significant
+        bit first with 0 for 'a'.  It is built by composing the two- and
+        four-symbol tables, so it costs O(256 * states) to build.
+        """
+        if self._blocks is None:
+            blocks = self.table
+            width = 2
+            while width < 256:
+                # Read a block of width symbols, then another one
+                blocks = array("l", (blocks[blocks[width * state + high] * width + low]
+                                     for state in range(self.num_states)
+                                     for high in range(width)
+                                     for low in range(width)))
+                width *= width
+            self._blocks = blocks
+        return self._blocks
+
+    def match_many(self, words):
+        """Return a list with the result of matches() for each word"""
+        if self.num_states > BLOCK_TABLE_STATES:
+            return [self.matches(word) for word in words]
+
+        table = self.table
+        blocks = self.block_table()
+        accepting = self.accepting
+        start = self.start
+        results = []
+        append = results.append
+        for word in words:
+            if word.strip(ALPHABET):
+                append(False)
+                continue
+
+            # Step the leading symbols one at a time, then eight at a time;
+            # short words are not worth the conversion
+            state = start
+            head = len(word) % 8 if len(word) >= 24 else len(word)
+            for code in word[:head].encode("ascii"):
+                state = table[2 * state + code - 97]
+            if len(word) > head:
+                bits = int(word[head:].translate(_BITS), 2)
+                for byte in bits.to_bytes((len(word) - head) // 8, "big"):
+                    state = blocks[256 * state + byte]
+            append(accepting[state] == 1)
+        return results
+
+    def __repr__(self):
+        return f"<DFA states={self.num_states} start={self.start}>"
+
+
+class _NFA:
+    # Thompson NFA: epsilon edges and at most a few symbol edges per state
+    __slots__ = ("epsilon", "moves")
+
+    def __init__(self):
+        self.epsilon = []
+        self.moves = []
+
+    def new_state(self):
+        self.epsilon.append([])
+        self.moves.append([])
+        return len(self.epsilon) - 1
+
+
+def _symbol_column(char):
+    column = ALPHABET.find(char)
+    if column < 0 or len(char) != 1:
+        raise ValueError(f"Symbol '{char}' is not in the alphabet {{a, b}}")
+    return column
+
+
+def _fragment(nfa, root):
+    """Add the Thompson fragment for root to nfa and return (start, end)"""
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        cls = node.__class__
+
+        if cls is Power:
+            # Each repetition needs its own copy of the operand's states
+            start = end = nfa.new_state()
+            for _ in range(node.count):
+                checkpoint()
+                part_start, part_end = _fragment(nfa, node.item)
+                nfa.epsilon[end].append(part_start)
+                end = part_end
+            results.append((start, end))
+            continue
+
+        if not expanded and cls in (Concat, Union, Star):
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children()))
+            continue
+
+        start = nfa.new_state()
+        end = nfa.new_state()
+        if cls is Symbol:
+            nfa.moves[start].append((_symbol_column(node.char), end))
+        elif cls is Epsilon:
+            nfa.epsilon[start].append(end)
+        elif cls is Empty:
+            pass
+        elif cls is Concat:
+            parts = results[-len(node.items):]
+            del results[-len(node.items):]
+            nfa.epsilon[start].append(parts[0][0])
+            for (_, previous_end), (next_start, _) in zip(parts, parts[1:]):
+                nfa.epsilon[previous_end].append(next_start)
+            nfa.epsilon[parts[-1][1]].append(end)
+        elif cls is Union:
+            parts = results[-len(node.items):]
+            del results[-len(node.items):]
+            for part_start, part_end in parts:
+                nfa.epsilon[start].append(part_start)
+                nfa.epsilon[part_end].append(end)
+        elif cls is Star:
+            part_start, part_end = results.pop()
+            nfa.epsilon[start].extend((part_start, end))
+            nfa.epsilon[part_end].extend((part_start, end))
+        else:
+            raise TypeError(f"Cannot compile {node!r}")
+        results.append((start, end))
+
+    return results.pop()
+
+
+def _closure(nfa, states):
+    epsilon = nfa.epsilon
+    seen = set(states)
+    stack = list(states)
+    while stack:
+        for target in epsilon[stack.pop()]:
+            if target not in seen:
+                seen.add(target)
+                stack.append(target)
+    return frozenset(seen)
+
+
+def compile_expression(node, max_states=MAX_STATES):
+    """Compile a regex_ast expression into a DFA.
+
+    Bounded repetitions are unrolled, so (a+b)^{N} costs N+1 states.  Raises
+    ValueError when the DFA would need more than max_states states.
+    """
+    nfa = _NFA()
+    nfa_start, nfa_end = _fragment(nfa, node)
+    moves = nfa.moves
+
+    start = _closure(nfa, (nfa_start,))
+    index = {start: 0}
+    subsets = [start]
+    table = array("l")
+    accepting = bytearray()
+
+    position = 0
+    while position < len(subsets):
+        subset = subsets[position]
+        position += 1
+        if not position % 1024:
+            checkpoint()
+        accepting.append(nfa_end in subset)
+
+        targets = ([], [])
+        for state in subset:
+            for column, target in moves[state]:
+                targets[column].append(target)
+
+        for column in (0, 1):
+            successor = _closure(nfa, targets[column])
+            successor_index = index.get(successor)
+            if successor_index is None:
+                if len(subsets) >= max_states:
+                    raise ValueError(f"The automaton needs more than {max_states} states")
+                successor_index = index[successor] = len(subsets)
+                subsets.append(successor)
+            table.append(successor_index)
+
+    return DFA(table, accepting)
+
+
+def minimize(dfa):
+    """Return the minimal DFA for the language of dfa.
+
+    Unreachable states are dropped, then equivalent states are merged with
+    Hopcroft's partition refinement in O(n log n).  States of the result are
+    numbered in breadth-first order from the start, so equivalent automata
+    minimise to identical tables.
+    """
+    table = dfa.table
+    # Reachable states, renumbered in breadth-first order
+    order = [dfa.start]
+    number = {dfa.start: 0}
+    for state in order:
+        for target in (table[2 * state], table[2 * state + 1]):
+            if target not in number:
+                number[target] = len(order)
+                order.append(target)
+    n = len(order)
+    successors = [[number[table[2 * state + column]] for state in order] for column in (0, 1)]
+    accepting = [dfa.accepting[state] for state in order]
+
+    predecessors = [[[] for _ in range(n)] for _ in (0, 1)]
+    for column in (0, 1):
+        column_predecessors = predecessors[column]
+        for state, target in enumerate(successors[column]):
+            column_predecessors[target].append(state)
+
+    blocks = [block for block in ([s for s in range(n) if accepting[s]], [s for s in range(n) if not accepting[s]])
+              if block]
+    blocks = [set(block) for block in blocks]
+    block_of = [0] * n
+    for index, block in enumerate(blocks):
+        for state in block:
+            block_of[state] = index
+
+    # Splitters still to process; only the smaller block needs to go in first
+    smallest = min(range(len(blocks)), key=lambda index: len(blocks[index]))
+    pending = {(smallest, column) for column in (0, 1)} if len(blocks) > 1 else set()
+    work = list(pending)
+    steps = 0
+    while work:
+        splitter = work.pop()
+        pending.discard(splitter)
+        index, column = splitter
+        column_predecessors = predecessors[column]
+
+        # States moving into the splitter on this symbol, grouped by block
+        touched = {}
+        for target in blocks[index]:
+            for source in column_predecessors[target]:
+                touched.setdefault(block_of[source], []).append(source)
+        steps += 1
+        if not steps % 1024:
+            checkpoint()
+
+        for split, movers in touched.items():
+            block = blocks[split]
+            if len(movers) == len(block):
+                continue
+            # Move the states that enter the splitter into a new block
+            new = len(blocks)
+            block.difference_update(movers)
+            blocks.append(set(movers))
+            for state in movers:
+                block_of[state] = new
+            for symbol in (0, 1):
+                if (split, symbol) in pending:
+                    pending.add((new, symbol))
+                    work.append((new, symbol))
+                else:
+                    smaller = new if len(movers) <= len(block) else split
+                    pending.add((smaller, symbol))
+                    work.append((smaller, symbol))
+
+    # Number the blocks in breadth-first order from the start
+    block_number = {block_of[0]: 0}
+    representatives = [0]
+    for state in representatives:
+        for column in (0, 1):
+            block = block_of[successors[column][state]]
+            if block not in block_number:
+                block_number[block] = len(representatives)
+                representatives.append(next(iter(blocks[block])))
+    minimal = array("l")
+    for state in representatives:
+        minimal.append(block_number[block_of[successors[0][state]]])
+        minimal.append(block_number[block_of[successors[1][state]]])
+    return DFA(minimal, bytearray(accepting[state] for state in representatives))
+
+
+def product(left, right, accept):
+    """Return the DFA running left and right side by side.
+
+    Only pairs of states reachable together are built.  A pair is final
+    when accept(left final, right final) is true, so operator.and_ gives the
+    intersection of the two languages and operator.or_ their union.
+    """
+    left_table, right_table = left.table, right.table
+    start = (left.start, right.start)
+    number = {start: 0}
+    pairs = [start]
+    table = array("l")
+    accepting = bytearray()
+    for position, (p, q) in enumerate(pairs):
+        if not (position + 1) % 1024:
+            checkpoint()
+        accepting.append(bool(accept(left.accepting[p], right.accepting[q])))
+        for column in (0, 1):
+            pair = (left_table[2 * p + column], right_table[2 * q + column])
+            index = number.get(pair)
+            if index is None:
+                index = number[pair] = len(pairs)
+                pairs.append(pair)
+            table.append(index)
+    return DFA(table, accepting)
+
+
+def complement(dfa):
+    """Return the DFA for the words over {a, b} that dfa rejects"""
+    return DFA(dfa.table, bytearray(1 - final for final in dfa.accepting), dfa.start)
+
+
+def failure_function(pattern):
+    """Return the KMP failure table: fail[q] is the length of the longest
+    proper border of pattern[:q], for q in 0..len(pattern)."""
+    fail = [0] * (len(pattern) + 1)
+    border = 0
+    for q in range(1, len(pattern)):
+        while border and pattern[q] != pattern[border]:
+            border = fail[border]
+        if pattern[q] == pattern[border]:
+            border += 1
+        fail[q + 1] = border
+    return fail
+
+
+def occurrence_table(pattern):
+    """Return KMP transitions over states 0..len(pattern).
+
+    State q means the last q symbols read are the longest prefix of pattern
+    seen so far; state len(pattern) means an occurrence just ended and moves
+    on like its border, so overlapping occurrences are all found.  The table
+    is laid out like DFA.table.
+    """
+    if pattern.strip(ALPHABET):
+        raise ValueError(f"Pattern '{pattern}' may only use the symbols a and b")
+    return array("l", _kmp_tables(pattern)[1])
+
+
+# Failure and transition tables of recently used patterns.  A pattern typed
+# one symbol at a time finds the tables of its prefix here and extends them
+# by one state instead of rebuilding them.
+KMP_CACHE_SIZE = 64
+_kmp_cache = OrderedDict()
+_kmp_lock = threading.Lock()
+
+
+def _kmp_tables(pattern):
+    with _kmp_lock:
+        tables = _kmp_cache.get(pattern)
+        if tables is not None:
+            _kmp_cache.move_to_end(pattern)
+            return tables
+        previous = _kmp_cache.get(pattern[:-1]) if pattern else None
+
+    if previous is None:
+        tables = _build_kmp(pattern)
+    else:
+        tables = _extend_kmp(pattern, *previous)
+
+    with _kmp_lock:
+        _kmp_cache[pattern] = tables
+        while len(_kmp_cache) > KMP_CACHE_SIZE:
+            _kmp_cache.popitem(last=False)
+    return tables
+
+
+def _build_kmp(pattern):
+    m = len(pattern)
+    fail = failure_function(pattern)
+    table = array("l", [0] * (2 * (m + 1)))
+    for q in range(m + 1):
+        for column, char in enumerate(ALPHABET):
+            if q < m and pattern[q] == char:
+                table[2 * q + column] = q + 1
+            elif q == 0:
+                table[column] = 0
+            else:
+                table[2 * q + column] = table[2 * fail[q] + column]
+    return fail, table
+
+
+def _extend_kmp(pattern, fail, table):
+    # Tables of pattern from those of pattern[:-1].  Rows below the old match
+    # state are unchanged.  The old match state now advances on the new
+    # symbol, and the new match state moves like its border, which is where
+    # the border of the old match state goes on the new symbol.
+    m = len(pattern)
+    column = ALPHABET.index(pattern[-1])
+    border = table[2 * fail[m - 1] + column] if m > 1 else 0
+    table = array("l", table)
+    table[2 * (m - 1) + column] = m
+    table.extend((table[2 * border], table[2 * border + 1]))
+    return fail + [border], table
+
+
+def avoiding_automaton(pattern):
+    """Return the DFA of all words that do not contain pattern"""
+    m = len(pattern)
+    table = occurrence_table(pattern)
+    # Seeing the pattern is final: state m becomes a rejecting sink
+    table[2 * m] = table[2 * m + 1] = m
+    accepting = bytearray([1] * m + [0])
+    return DFA(table, accepting)
+
+
+def _trim(dfa):
+    # States reachable from the start that can still reach a final state
+    forward = {dfa.start}
+    stack = [dfa.start]
+    while stack:
+        state = stack.pop()
+        for target in (dfa.table[2 * state], dfa.table[2 * state + 1]):
+            if target not in forward:
+                forward.add(target)
+                stack.append(target)
+
+    predecessors = [[] for _ in range(dfa.num_states)]
+    for state in range(dfa.num_states):
+        for column in (0, 1):
+            predecessors[dfa.table[2 * state + column]].append(state)
+    backward = {state for state in range(dfa.num_states) if dfa.accepting[state]}
+    stack = list(backward)
+    while stack:
+        for source in predecessors[stack.pop()]:
+            if source not in backward:
+                backward.add(source)
+                stack.append(source)
+    return forward & backward
+
+
+def eliminate_states(edges, start, final, order=None):
+    """Return the expression for all paths from start to final in a
+    generalised automaton, by eliminating every other state.
+
+    ``edges`` maps each state to a dict {target: expression} and is consumed.
+    Without an explicit ``order``, the next state to remove is the one whose
+    removal adds the least expression size, estimated from the sizes of its
+    incoming, outgoing and loop labels.
+    """
+    incoming = {state: {} for state in edges}
+    for source, targets in edges.items():
+        for target, label in targets.items():
+            incoming.setdefault(target, {})[source] = label
+            edges.setdefault(target, {})
+
+    remaining = [state for state in edges if state != start and state != final]
+    if order is not None:
+        remaining = list(order)
+
+    def cost(state):
+        loop = edges[state].get(state)
+        ins = [label.size for source, label in incoming[state].items() if source != state]
+        outs = [label.size for target, label in edges[state].items() if target != state]
+        weight = sum(ins) * (len(outs) - 1) + sum(outs) * (len(ins) - 1)
+        if loop is not None:
+            weight += loop.size * (len(ins) * len(outs) - 1)
+        return weight
+
+    total = len(remaining)
+    # Removing a state only changes the weights of its neighbours, so the
+    # weights are kept and recomputed for those alone
+    weights = {state: cost(state) for state in remaining} if order is None else None
+    while remaining:
+        checkpoint(total - len(remaining), total)
+        if order is None:
+            victim = min(remaining, key=weights.__getitem__)
+            remaining.remove(victim)
+            del weights[victim]
+        else:
+            victim = remaining.pop(0)
+
+        loop = edges[victim].pop(victim, None)
+        incoming[victim].pop(victim, None)
+        loop = star(loop) if loop is not None else None
+        for source, into in incoming[victim].items():
+            del edges[source][victim]
+            for target, out in edges[victim].items():
+                path = concat(into, loop, out) if loop is not None else concat(into, out)
+                existing = edges[source].get(target)
+                label = path if existing is None else union(existing, path)
+                edges[source][target] = label
+                incoming[target][source] = label
+        for target in edges[victim]:
+            del incoming[target][victim]
+        if weights is not None:
+            for neighbour in incoming[victim].keys() | edges[victim].keys():
+                if neighbour in weights:
+                    weights[neighbour] = cost(neighbour)
+        del edges[victim]
+        del incoming[victim]
+
+    return edges[start].get(final, EMPTY)
+
+
+def to_expression(dfa):
+    """Convert a DFA into an equivalent regex_ast expression"""
+    live = _trim(dfa)
+    if dfa.start not in live:
+        return EMPTY
+
+    symbol_nodes = [Symbol(char) for char in ALPHABET]
+    start, final = "start", "final"
+    edges = {start: {dfa.start: EPSILON}, final: {}}
+    for state in sorted(live):
+        targets = edges[state] = {}
+        for column in (0, 1):
+            target = dfa.table[2 * state + column]
+            if target in live:
+                existing = targets.get(target)
+                targets[target] = symbol_nodes[column] if existing is None else union(existing, symbol_nodes[column])
+        if dfa.accepting[state]:
+            targets[final] = EPSILON
+    return eliminate_states(edges, start, final)
+
+
+def occurrence_paths(pattern):
+    """Split words by their occurrences of pattern, as four expressions.
+
+    Returns (Z0, S, L, Zm) where, reading through the KMP automaton,
+    Z0 is any prefix with no occurrence, S runs from the start up to the end
+    of the first occurrence, L from the end of one occurrence to the end of
+    the next, and Zm from the end of an occurrence with no further one.
+    Every word with k >= 1 occurrences splits uniquely as S L^{k-1} Zm.
+    """
+    m = len(pattern)
+    table = occurrence_table(pattern)
+    symbol_nodes = [Symbol(char) for char in ALPHABET]
+
+    def paths(source, to_hit):
+        # States 0..m-1 keep their numbers, "after" is state m as a source
+        # only and "hit" absorbs every transition that completes an occurrence
+        edges = {"start": {source: EPSILON}, "final": {}}
+        for state in list(range(m)) + ["after"]:
+            row = m if state == "after" else state
+            targets = edges[state] = {}
+            for column in (0, 1):
+                target = table[2 * row + column]
+                if target == m:
+                    target = "hit"
+                existing = targets.get(target)
+                targets[target] = symbol_nodes[column] if existing is None else union(existing, symbol_nodes[column])
+            if not to_hit:
+                targets["final"] = EPSILON
+        edges["hit"] = {"final": EPSILON} if to_hit else {}
+        return eliminate_states(edges, "start", "final")
+
+    return paths(0, False), paths(0, True), paths("after", True), paths("after", False)
+
+
+def counting_automaton(pattern, N):
+    """Return the DFA of words whose number of (possibly overlapping)
+    occurrences of pattern is divisible by N.
+
+    It is the product of the KMP automaton and a counter modulo N, with
+    (len(pattern) + 1) * N states; state c * (len(pattern) + 1) + q means
+    KMP state q with c occurrences so far, modulo N.
+    """
+    if N <= 0:
+        return DFA(array("l", [0, 0]), bytearray([0]))
+
+    width = len(pattern) + 1
+    occurrences = occurrence_table(pattern)
+    table = array("l", [0] * (2 * width * N))
+    accepting = bytearray(width * N)
+    for count in range(N):
+        base = count * width
+        bumped = ((count + 1) % N) * width
+        for q in range(width):
+            for column in (0, 1):
+                target = occurrences[2 * q + column]
+                table[2 * (base + q) + column] = (bumped if target == width - 1 else base) + target
+    accepting[:width] = b"\x01" * width
+    return DFA(table, accepting)
@@ -0,0 +1,207 @@
+"""Headless batch generation over RegexModel.
+
+Reads generation jobs as JSON lines, fans them out across a process pool in
+chunks and streams one JSON result line per job back out, in input order.
+No Qt import is involved, so this runs on machines without a display.
+
+Each job line is an object such as
+
+    {"id": "job-1", "index": 4, "P": "aa"}
+    {"index": 9, "N": 5, "options": {"compact": true}}
+    {"index": 13, "P": "a", "N": 2}
+
+and produces a line such as
+
+    {"line": 1, "id": "job-1", "index": 4, "regex": "...",
+     "description": "...", "elapsed": 0.00002, "error": null}
+
+With --regex-dir each expression is streamed to <dir>/<line>.txt by the
+worker instead, and the result line carries "regex_file" and
+"regex_length" with "regex" set to null, so no expression is ever held
+whole in memory or sent between processes.
+
+Usage:
+    python batch.py jobs.jsonl -o results.jsonl --workers 4 --chunk-size 256
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from model import RegexModel
+
+# Strategy indices grouped by the inputs they take (mirrors the controller)
+PATTERN_ONLY = (0, 1, 2, 3, 4, 5, 6, 7)
+NUMBER_ONLY = (8, 9, 10, 11, 12)
+PATTERN_AND_NUMBER = (13, 14, 15)
+
+_model = None
+_store_path = None
+_regex_dir = None
+
+
+def _init_worker(store_path, regex_dir=None):
+    global _model, _store_path, _regex_dir
+    if store_path != _store_path:
+        _model = None  # Built again on the new store
+    _store_path = store_path
+    _regex_dir = regex_dir
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        _model = RegexModel(store_path=_store_path)
+    return _model
+
+
+def job_arguments(job):
+    """Return the positional arguments a job passes to its strategy"""
+    index = job["index"]
+    if index in PATTERN_ONLY:
+        return (job["P"],)
+    elif index in NUMBER_ONLY:
+        return (int(job["N"]),)
+    elif index in PATTERN_AND_NUMBER:
+        return (job["P"], int(job["N"]))
+    raise ValueError(f"Unknown pattern index {index}")
+
+
+def run_job(job, model=None, regex_path=None):
+    """Generate the regex and description for a single decoded job.
+
+    With regex_path the regex is streamed to that file instead of being
+    returned in the result.
+    """
+    model = model or _get_model()
+    result = {"id": job.get("id"), "index": job.get("index"),
+              "regex": None, "description": None, "elapsed": None, "error": None}
+    start = time.perf_counter()
+    try:
+        strategy = model.get_strategy(job["index"])
+        if strategy is None:
+            raise ValueError(f"No strategy found for pattern index {job['index']}")
+
+        args = job_arguments(job)
+        options = job.get("options") or {}
+        if regex_path is None:
+            result["regex"] = strategy.generate_regex(*args, **options)
+        else:
+            with open(regex_path, "w", encoding="utf-8") as target:
+                result["regex_length"] = strategy.write_regex(target, *args, **options)
+            result["regex_file"] = regex_path
+        result["description"] = strategy.get_description(*args)
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def _run_line(line_number, line):
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError("job must be a JSON object")
+    except ValueError as exc:
+        result = {"id": None, "index": None, "regex": None, "description": None,
+                  "elapsed": 0.0, "error": f"InvalidJob: {exc}"}
+    else:
+        regex_path = None
+        if _regex_dir is not None:
+            regex_path = os.path.join(_regex_dir, f"{line_number}.txt")
+        result = run_job(job, regex_path=regex_path)
+    result = {"line": line_number, **result}
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _run_chunk(chunk):
+    # Runs inside a worker process; results are serialised there so the
+    # parent only has to write strings
+    return [_run_line(line_number, line) for line_number, line in chunk]
+
+
+def _numbered_jobs(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            yield line_number, line
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_results(lines, workers=None, chunk_size=256, max_pending=None, store_path=None, regex_dir=None):
+    """Yield one JSON result line per job line, in input order.
+
+    Only ``max_pending`` chunks are in flight at any time, so the input is
+    consumed lazily and memory stays bounded regardless of input size.
+    With ``store_path``, every worker shares that persistent result store.
+    With ``regex_dir``, expressions are streamed to files in that directory.
+    """
+    if regex_dir is not None:
+        os.makedirs(regex_dir, exist_ok=True)
+    _init_worker(store_path, regex_dir)
+    jobs = _numbered_jobs(lines)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for line_number, line in jobs:
+            yield _run_line(line_number, line)
+        return
+
+    if max_pending is None:
+        max_pending = workers * 2
+
+    # Only imported when a pool is needed; it is slow to import
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(store_path, regex_dir)) as executor:
+        pending = deque()
+        for chunk in _chunks(jobs, chunk_size):
+            pending.append(executor.submit(_run_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate regular expressions for a JSONL file of jobs.")
+    parser.add_argument("input", help="JSONL job file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL result file, or - for stdout")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count, 1 runs inline)")
+    parser.add_argument("-c", "--chunk-size", type=int, default=256, help="jobs sent to a worker at a time")
+    parser.add_argument("-s", "--store", default=None,
+                        help="SQLite file for reusing slow results across runs and workers")
+    parser.add_argument("-r", "--regex-dir", default=None,
+                        help="stream each regex to <dir>/<line>.txt instead of the result line")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for result in iter_results(source, workers=args.workers, chunk_size=args.chunk_size,
+                                   store_path=args.store, regex_dir=args.regex_dir):
+            target.write(result)
+            target.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+"""Standalone benchmark scripts, run from the project root with
+``python -m benchmarks.<name>``."""
@@ -0,0 +1,63 @@
+"""Multi-pattern membership: one Aho–Corasick pass versus k separate scans.
+
+For k random patterns, times finding which of them occur in random words
+three ways: AhoCorasick.occurring() (one pass over each word), k scans
+with the single-pattern "contains P" DFAs the strategies compile (the way
+k patterns were checked before), and k scans with Python's C-level
+``pattern in word`` for reference.  Patterns are long enough that most do
+not occur, so no scan can stop early.  Also reports the trie size, the
+time to build it and the "contains all" check.
+
+    python -m benchmarks.bench_aho_corasick --counts 1 10 100 1000
+"""
+import argparse
+import random
+import time
+
+import model
+from aho_corasick import AhoCorasick
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--pattern-length", type=int, default=16)
+    parser.add_argument("--words", type=int, default=20)
+    parser.add_argument("--word-length", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    def random_word(length):
+        return "".join(rng.choice("ab") for _ in range(length))
+
+    words = [random_word(args.word_length) for _ in range(args.words)]
+    symbols = len(words) * args.word_length
+    contains = model.RegexModel.strategy_classes[3]()
+
+    print(f"{'k':>5} {'states':>7} {'build ms':>8} {'AC M/s':>8} {'k DFA M/s':>9} {'k str M/s':>9} "
+          f"{'speedup':>8} {'all M/s':>8}")
+    for k in args.counts:
+        patterns = [random_word(args.pattern_length) for _ in range(k)]
+        matcher, built = timed(AhoCorasick, patterns)
+        masks, ac_time = timed(lambda: [matcher.occurring(word) for word in words])
+
+        dfas = [contains.build_automaton(pattern) for pattern in patterns]
+        separate, dfa_time = timed(lambda: [[dfa.matches(word) for dfa in dfas] for word in words])
+        native, str_time = timed(lambda: [[pattern in word for pattern in patterns] for word in words])
+        assert separate == native == [[bool(mask >> bit & 1) for bit in range(k)] for mask in masks]
+
+        _, all_time = timed(lambda: [matcher.contains_all(word) for word in words])
+        print(f"{k:>5} {matcher.num_states:>7} {built * 1000:>8.1f} {symbols / ac_time / 1e6:>8.2f} "
+              f"{symbols / dfa_time / 1e6:>9.3f} {symbols / str_time / 1e6:>9.2f} {dfa_time / ac_time:>7.1f}x "
+              f"{symbols / all_time / 1e6:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Three-way compositions: reachable product size, build time and matching speed.
+
+For random patterns P1, P2, P3 of each length m, builds the composition
+"contains P1 and ends with P2 but not contains P3" and reports the full
+product bound (m+2)^3 against the states actually reachable, the minimal
+DFA size, the time to explore the product and to turn it into an
+expression, and matching throughput over random words: the lazy
+ProductAutomaton from cold (states created while matching), warm, and the
+minimised DFA.
+
+    python -m benchmarks.bench_composition --lengths 4 16 64 256 --words 200
+"""
+import argparse
+import random
+import time
+
+from automata import minimize, to_expression
+from composition import compose
+from regex_ast import render_compact
+
+
+def throughput(matcher, words):
+    start = time.perf_counter()
+    for word in words:
+        matcher.matches(word)
+    return sum(map(len, words)) / (time.perf_counter() - start) / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[4, 16, 64, 256, 1024])
+    parser.add_argument("--words", type=int, default=200, help="words per throughput run")
+    parser.add_argument("--word-length", type=int, default=10000)
+    parser.add_argument("--max-expression-states", type=int, default=2000,
+                        help="skip the expression for larger minimal DFAs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    def random_word(length):
+        return "".join(rng.choice("ab") for _ in range(length))
+
+    print(f"{'m':>5} {'bound':>12} {'reachable':>9} {'minimal':>7} {'explore s':>9} {'expr s':>7} "
+          f"{'expr chars':>10} {'cold M/s':>8} {'warm M/s':>8} {'dfa M/s':>8}")
+    for m in args.lengths:
+        P1, P2, P3 = random_word(m), random_word(m), random_word(m)
+        # Words that contain P1 now and then, so the product leaves its start
+        words = [random_word(args.word_length // 2) + P1 + random_word(args.word_length // 2)
+                 for _ in range(args.words)]
+        clauses = (("contains", P1), ("and", "ends", P2), ("but not", "contains", P3))
+
+        product = compose(*clauses)
+        cold = throughput(product, words)
+        warm = throughput(product, words)
+
+        start = time.perf_counter()
+        dfa = compose(*clauses).to_dfa()
+        explored = time.perf_counter() - start
+        minimal = minimize(dfa)
+        dfa_speed = throughput(minimal, words)
+
+        if minimal.num_states <= args.max_expression_states:
+            start = time.perf_counter()
+            chars = len(render_compact(to_expression(minimal)))
+            expression = f"{time.perf_counter() - start:>7.2f} {chars:>10}"
+        else:
+            expression = f"{'-':>7} {'-':>10}"
+        print(f"{m:>5} {(m + 2) ** 3:>12} {dfa.num_states:>9} {minimal.num_states:>7} {explored:>9.3f} "
+              f"{expression} {cold:>8.2f} {warm:>8.2f} {dfa_speed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
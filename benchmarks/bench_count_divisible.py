@@ -0,0 +1,44 @@
+"""Growth of "# of P in w is divisible by N" in N and |P|.
+
+For each (P, N) reports the expression build time, its size in nodes and in
+characters (with ^{N} powers, and spelled out), and the build time and state
+count of the DFA used for membership tests.
+
+    python -m benchmarks.bench_count_divisible --sizes 1 2 10 100 1000
+"""
+import argparse
+import time
+
+import model
+from regex_ast import render_formal
+
+PATTERNS = ["a", "ab", "aba", "abbab", "abbabaabba", "abbabaabbaabbbabababbbaabbbaba"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 2, 10, 100, 1000])
+    parser.add_argument("--patterns", nargs="+", default=PATTERNS)
+    args = parser.parse_args(argv)
+
+    strategy = model.CountDivisibleByStrategy()
+    print(f"{'|P|':>4} {'N':>5} {'regex ms':>9} {'nodes':>6} {'chars':>7} {'expanded chars':>15} "
+          f"{'dfa ms':>8} {'dfa states':>11}")
+    for pattern in args.patterns:
+        for N in args.sizes:
+            model._occurrence_paths.cache_clear()
+            start = time.perf_counter()
+            node = strategy.build_expression(pattern, N)
+            text = strategy.render(node)
+            regex_ms = (time.perf_counter() - start) * 1000
+            expanded = len(render_formal(node, expand_powers=True))
+
+            start = time.perf_counter()
+            dfa = strategy.build_automaton(pattern, N)
+            dfa_ms = (time.perf_counter() - start) * 1000
+            print(f"{len(pattern):>4} {N:>5} {regex_ms:>9.2f} {node.size:>6} {len(text):>7} {expanded:>15} "
+                  f"{dfa_ms:>8.2f} {dfa.num_states:>11}")
+
+
+if __name__ == '__main__':
+    main()
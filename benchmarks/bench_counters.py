@@ -0,0 +1,71 @@
+"""Counting automata against unrolled DFAs for (a+b)^{N} as N grows.
+
+For the strategies whose expression repeats (a+b) N times, builds the DFA
+that unrolls the repetition (compile_expression, N+1 states or more) and
+the counters.CounterAutomaton that RegexModel.matches() now uses, and
+reports the memory each keeps (traced with tracemalloc), the build time
+and the matching throughput on random words of up to 2N symbols.
+
+    python -m benchmarks.bench_counters --sizes 10 100 1000 10000 --words 20000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from automata import compile_expression
+from counters import counter_automaton
+from model import RegexModel
+
+# Strategy index and arguments for a given N
+CASES = [
+    ("12 |w| = N", 12, lambda N: (N,)),
+    ("10 |w| >= N", 10, lambda N: (N,)),
+    ("14 Nth is ab", 14, lambda N: ("ab", N)),
+]
+
+
+def measure(build):
+    # (object, bytes still allocated for it, seconds to build)
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def throughput(matcher, words):
+    start = time.perf_counter()
+    results = matcher.match_many(words)
+    return results, len(words) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10_000])
+    parser.add_argument("--words", type=int, default=20_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<14} {'N':>6} {'DFA states':>10} {'DFA KB':>8} {'DFA ms':>8} {'DFA words/s':>11} "
+          f"{'ctr states':>10} {'ctr KB':>7} {'ctr ms':>7} {'ctr words/s':>11}")
+    for label, index, arguments in CASES:
+        strategy = RegexModel.strategy_classes[index]()
+        for N in args.sizes:
+            rng = random.Random(N)
+            words = ["".join(rng.choice("ab") for _ in range(rng.randint(0, 2 * N))) for _ in range(args.words)]
+            node = strategy.build_expression(*arguments(N))
+            dfa, dfa_bytes, dfa_time = measure(lambda: compile_expression(node))
+            counters, counter_bytes, counter_time = measure(lambda: counter_automaton(node))
+            expected, dfa_rate = throughput(dfa, words)
+            results, counter_rate = throughput(counters, words)
+            if results != expected:
+                raise AssertionError(f"{label} N={N}: the counting automaton disagrees")
+            print(f"{label:<14} {N:>6} {dfa.num_states:>10} {dfa_bytes / 1024:>8.1f} {dfa_time * 1000:>8.2f} "
+                  f"{dfa_rate:>11.0f} {counters.num_states:>10} {counter_bytes / 1024:>7.1f} "
+                  f"{counter_time * 1000:>7.2f} {counter_rate:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
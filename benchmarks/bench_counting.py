@@ -0,0 +1,57 @@
+"""Counting words per length and sampling them uniformly.
+
+For a few strategies and word lengths n, times RegexModel.count_members()
+exactly and modulo 2^61 - 1, building a Sampler, and drawing samples (in
+samples per second and microseconds per symbol).
+
+    python -m benchmarks.bench_counting --lengths 100 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from counting import Sampler, count_words
+from model import RegexModel
+
+CASES = [(8, (10,)), (13, ("a", 2)), (13, ("ab", 3)), (3, ("aba",)), (4, ("aa",)), (15, ("a", 5))]
+MODULUS = (1 << 61) - 1
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    model = RegexModel()
+    print(f"{'case':<10} {'n':>7} {'count bits':>10} {'count ms':>9} {'mod ms':>7} {'sampler s':>9} "
+          f"{'samples/s':>9} {'us/symbol':>9}")
+    for index, case_args in CASES:
+        dfa = model.compile(index, *case_args)
+        for n in args.lengths:
+            count, count_time = timed(count_words, dfa, n)
+            residue, mod_time = timed(count_words, dfa, n, MODULUS)
+            assert residue == count % MODULUS
+            sampler, build_time = timed(Sampler, dfa, n)
+            assert sampler.count == count
+            if count:
+                words, sample_time = timed(sampler.samples, args.samples, rng)
+                assert all(dfa.matches(word) for word in words)
+                rate = f"{args.samples / sample_time:>9.0f} {sample_time / args.samples / max(n, 1) * 1e6:>9.3f}"
+            else:
+                rate = f"{'-':>9} {'-':>9}"
+            label = f"{index} {','.join(map(str, case_args))}"
+            print(f"{label:<10} {n:>7} {count.bit_length():>10} {count_time * 1000:>9.2f} {mod_time * 1000:>7.2f} "
+                  f"{build_time:>9.3f} {rate}")
+
+
+if __name__ == '__main__':
+    main()
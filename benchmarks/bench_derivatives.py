@@ -0,0 +1,74 @@
+"""Lazy derivative DFA against eager automaton construction, per strategy.
+
+For each strategy, matches the same random {a,b} words once with the DFA
+from build_automaton(), timing construction and matching separately, and
+once with a fresh derivatives.LazyDFA, where the states are created during
+the first pass; a second pass over the words shows the warm speed.  The
+last strategies use N large enough for the full DFA to be exponential,
+where the lazy DFA only creates the states the words reach.
+
+    python -m benchmarks.bench_derivatives --words 10000 --length 32
+"""
+import argparse
+import time
+
+from automata import minimize
+from benchmarks.bench_matching import random_words
+from model import RegexModel
+
+# One representative argument tuple per strategy index, then cases whose
+# eager DFA has 2^N states; the last one is over automata.MAX_STATES
+CASES = [
+    (0, ("aba",)), (1, ("aba",)), (2, ("aba",)), (3, ("aba",)), (4, ("aa",)),
+    (5, ("aba",)), (6, ("aba",)), (7, ("aba",)),
+    (8, (10,)), (9, (10,)), (10, (10,)), (11, (10,)), (12, (32,)),
+    (13, ("a", 2)), (14, ("b", 5)), (15, ("a", 5)),
+    (15, ("a", 12)), (15, ("ab", 16)), (15, ("a", 18)), (15, ("b", 24)),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=10_000)
+    parser.add_argument("--length", type=int, default=32, help="maximum word length")
+    args = parser.parse_args(argv)
+
+    words = random_words(args.words, args.length)
+    model = RegexModel()
+    print(f"{'index':>5} {'arguments':<10} {'eager states':>12} {'build s':>8} {'match s':>8} "
+          f"{'lazy states':>11} {'flushes':>7} {'first s':>8} {'warm s':>8}")
+    for index, case_args in CASES:
+        strategy = RegexModel.strategy_classes[index]()
+
+        start = time.perf_counter()
+        try:
+            dfa = strategy.build_automaton(*case_args)
+        except ValueError:
+            dfa = None  # Too many states
+        built = time.perf_counter() - start
+        if dfa is not None:
+            start = time.perf_counter()
+            expected = dfa.match_many(words)
+            matched = time.perf_counter() - start
+            eager = f"{minimize(dfa).num_states:>12} {built:>8.3f} {matched:>8.3f}"
+        else:
+            expected = strategy.build_matcher(*case_args).match_many(words)
+            eager = f"{'too many':>12} {built:>8.3f} {'-':>8}"
+
+        lazy = model.get_lazy_matcher(index, *case_args)
+        start = time.perf_counter()
+        results = lazy.match_many(words)
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        lazy.match_many(words)
+        warm = time.perf_counter() - start
+        if results != expected:
+            raise AssertionError(f"Strategy {index} {case_args}: the lazy DFA disagrees")
+
+        label = ", ".join(map(str, case_args))
+        print(f"{index:>5} {label:<10} {eager} {lazy.num_states:>11} {lazy.flushes:>7} {first:>8.3f} "
+              f"{warm:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
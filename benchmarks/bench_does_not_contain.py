@@ -0,0 +1,48 @@
+"""Output size and generation time of "does not contain P" for |P| up to 30.
+
+For each length, a few seeded random patterns plus the periodic patterns
+a^n and (ab)^* are generated cold (with the per-pattern cache cleared).
+
+    python -m benchmarks.bench_does_not_contain --max-length 30 --samples 5
+"""
+import argparse
+import random
+import time
+
+import model
+
+
+def patterns_of_length(length, samples, rng):
+    yield "a" * length
+    yield ("ab" * length)[:length]
+    for _ in range(samples):
+        yield "".join(rng.choice("ab") for _ in range(length))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-length", type=int, default=30)
+    parser.add_argument("--samples", type=int, default=5, help="random patterns per length")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    strategy = model.DoesNotContainStrategy()
+    print(f"{'|P|':>4} {'mean ms':>9} {'max ms':>9} {'mean nodes':>11} {'max nodes':>10} "
+          f"{'mean chars':>11} {'max chars':>10}")
+    for length in range(1, args.max_length + 1):
+        times, nodes, chars = [], [], []
+        for pattern in patterns_of_length(length, args.samples, rng):
+            model._avoiding_expression.cache_clear()
+            start = time.perf_counter()
+            text = strategy.generate_regex(pattern)
+            times.append((time.perf_counter() - start) * 1000)
+            nodes.append(strategy.build_expression(pattern).size)
+            chars.append(len(text))
+        print(f"{length:>4} {sum(times) / len(times):>9.2f} {max(times):>9.2f} "
+              f"{sum(nodes) / len(nodes):>11.0f} {max(nodes):>10} "
+              f"{sum(chars) / len(chars):>11.0f} {max(chars):>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Shortlex enumeration speed per strategy.
+
+For each strategy, times RegexModel.iter_members() over the first --count
+words (fewer when the language is finite and smaller) and the time to the
+first word of a page starting deep into the language, which the counts of
+completions let the enumerator reach without generating what it skips.
+
+    python -m benchmarks.bench_enumeration --count 100000 --offsets 1000000 1000000000000
+"""
+import argparse
+import time
+
+from model import RegexModel
+
+# One representative argument tuple per strategy index
+CASES = {
+    0: ("aba",), 1: ("aba",), 2: ("aba",), 3: ("aba",), 4: ("aa",),
+    5: ("aba",), 6: ("aba",), 7: ("aba",),
+    8: (10,), 9: (20,), 10: (10,), 11: (20,), 12: (32,),
+    13: ("a", 2), 14: ("b", 5), 15: ("a", 5),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--offsets", type=int, nargs="+", default=[10 ** 6, 10 ** 12])
+    args = parser.parse_args(argv)
+
+    model = RegexModel()
+    print(f"{'index':>5} {'arguments':<10} {'words':>8} {'words/s':>10} {'last length':>11} "
+          + " ".join(f"{'ms @' + format(offset, '.0e'):>10}" for offset in args.offsets))
+    for index, case_args in CASES.items():
+        model.compile(index, *case_args)  # Not part of the timing
+        start = time.perf_counter()
+        words = 0
+        last = ""
+        for last in model.iter_members(index, *case_args, limit=args.count):
+            words += 1
+        elapsed = time.perf_counter() - start
+
+        cells = []
+        for offset in args.offsets:
+            start = time.perf_counter()
+            page = list(model.iter_members(index, *case_args, offset=offset, limit=1))
+            cells.append(f"{(time.perf_counter() - start) * 1000:>10.2f}" if page else f"{'-':>10}")
+        label = ", ".join(map(str, case_args))
+        print(f"{index:>5} {label:<10} {words:>8} {words / elapsed:>10.0f} {len(last):>11} " + " ".join(cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Time to decide equivalence of large automata.
+
+For each N, compares pairs of DFAs with around N states:
+
+    count         "# of ab divisible by N/2": the counting automaton against
+                  the strategy's expression compiled by subset construction
+                  (equal languages)
+    length        |w| = N against |w| = N + 1 (differ; the shortest
+                  distinguishing word has length N)
+    count N+1     counting automata for N/2 and N/2 + 1 (differ on a long word)
+
+Reports the state counts, the time to build both automata and the time
+taken by equivalence.distinguishing_word().
+
+    python -m benchmarks.bench_equivalence --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+import model
+from automata import compile_expression, counting_automaton
+from equivalence import distinguishing_word
+from regex_ast import ANY_SYMBOL, power
+
+
+def pairs(N):
+    counting = model.RegexModel.strategy_classes[13]()
+    half = max(N // 2, 1)
+    yield "count", lambda: counting_automaton("ab", half), \
+        lambda: compile_expression(counting.build_expression("ab", half))
+    yield "length", lambda: compile_expression(power(ANY_SYMBOL, N)), \
+        lambda: compile_expression(power(ANY_SYMBOL, N + 1))
+    yield "count N+1", lambda: counting_automaton("ab", half), lambda: counting_automaton("ab", half + 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"{'N':>7} {'case':<10} {'states':>15} {'build s':>8} {'check s':>8} {'witness':>8}")
+    for N in args.sizes:
+        for label, build_left, build_right in pairs(N):
+            start = time.perf_counter()
+            left, right = build_left(), build_right()
+            built = time.perf_counter() - start
+            start = time.perf_counter()
+            witness = distinguishing_word(left, right)
+            checked = time.perf_counter() - start
+            states = f"{left.num_states}/{right.num_states}"
+            length = "equal" if witness is None else len(witness)
+            print(f"{N:>7} {label:<10} {states:>15} {built:>8.2f} {checked:>8.2f} {length:>8}")
+
+
+if __name__ == '__main__':
+    main()
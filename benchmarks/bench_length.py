@@ -0,0 +1,69 @@
+"""Size and build time of the |w| < N / |w| <= N expressions.
+
+Compares the original builder (one f-string append per unit), the expanded
+output built with joins, and the compact nested output.
+
+    python -m benchmarks.bench_length --sizes 10 100 1000 10000
+"""
+import argparse
+import time
+
+from model import LengthLessThanOrEqualStrategy
+
+
+def original_builder(N):
+    # The builder as it was before compact mode, kept as the baseline
+    parts = ["ε"]
+    for i in range(1, N + 1):
+        part = "((a)+(b))"
+        for _ in range(1, i):
+            part = f"{part}•((a)+(b))"
+        parts.append(part)
+    return " + ".join(f"({part})" for part in parts)
+
+
+def expanded_size(N):
+    # len() of the expanded output without building it: "(ε)", then for each
+    # length i the parenthesised i units and i-1 dots, joined by " + "
+    unit = len("((a)+(b))")
+    if N == 0:
+        return len("ε")  # Printed bare, without the parentheses
+    return 3 + sum(2 + i * unit + (i - 1) for i in range(1, N + 1)) + 3 * N
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 3000, 10000])
+    parser.add_argument("--max-original", type=int, default=1000,
+                        help="largest N to run the original cubic-time builder for")
+    parser.add_argument("--max-expanded", type=int, default=3000,
+                        help="largest N to build the expanded output for")
+    args = parser.parse_args(argv)
+
+    strategy = LengthLessThanOrEqualStrategy()
+    print(f"{'N':>6} {'original s':>11} {'expanded s':>11} {'expanded chars':>15} "
+          f"{'compact s':>10} {'compact chars':>14}")
+    for N in args.sizes:
+        original = "skipped"
+        if N <= args.max_original:
+            original = f"{timed(original_builder, N)[0]:.4f}"
+
+        expanded = "skipped"
+        if N <= args.max_expanded:
+            elapsed, text = timed(strategy.generate_regex, N)
+            expanded = f"{elapsed:.4f}"
+            assert len(text) == expanded_size(N)
+
+        elapsed, text = timed(strategy.generate_regex, N, True)
+        print(f"{N:>6} {original:>11} {expanded:>11} {expanded_size(N):>15} "
+              f"{elapsed:>10.6f} {len(text):>14}")
+
+
+if __name__ == '__main__':
+    main()
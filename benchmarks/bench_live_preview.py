@@ -0,0 +1,70 @@
+"""Per-keystroke latency of live preview while typing a long pattern.
+
+Types a random pattern one symbol at a time and, after every keystroke,
+generates the expression and description the way the preview does, through
+a RegexModel and its cache.  Reports the mean, 95th percentile and worst
+latency per strategy and how many keystrokes went over the frame budget.
+In the GUI this work runs on a worker thread, so an over-budget keystroke
+delays the preview but does not freeze the window.
+
+Live preview stops above a strategy's preview_max_pattern symbols
+(model.PREVIEW_MAX_PATTERN for the ones built by state elimination).  The
+benchmark fails if the 95th percentile latency of the keystrokes that are
+previewed goes over the budget of one 60 Hz frame, 16.7 ms.
+
+    python -m benchmarks.bench_live_preview --length 400 --strategies 0 3 4 13
+    python -m benchmarks.bench_live_preview --no-incremental
+"""
+import argparse
+import random
+import statistics
+import time
+
+import automata
+import model
+
+FRAME_MS = 1000 / 60
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=400)
+    parser.add_argument("--strategies", type=int, nargs="+", default=[0, 2, 3, 4, 13, 15])
+    parser.add_argument("--number", type=int, default=3, help="N for strategies 13-15")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-incremental", action="store_true",
+                        help="rebuild the KMP tables on every keystroke")
+    args = parser.parse_args(argv)
+
+    if args.no_incremental:
+        automata.KMP_CACHE_SIZE = 0
+    rng = random.Random(args.seed)
+    pattern = "".join(rng.choice("ab") for _ in range(args.length))
+
+    print(f"frame budget {FRAME_MS:.1f} ms, |P| up to {args.length}")
+    print(f"{'strategy':>8} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'over budget':>12} "
+          f"{'previewed':>9} {'p95 ms':>8}")
+    for index in args.strategies:
+        regex_model = model.RegexModel()
+        strategy = regex_model.get_strategy(index)
+        latencies = []
+        for length in range(1, len(pattern) + 1):
+            arguments = (pattern[:length], args.number) if index >= 13 else (pattern[:length],)
+            start = time.perf_counter()
+            strategy.generate_regex(*arguments)
+            strategy.get_description(*arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        over = sum(latency > FRAME_MS for latency in latencies)
+        # Keystrokes live preview regenerates for
+        previewed = latencies[:strategy.preview_max_pattern]
+        previewed_p95 = statistics.quantiles(previewed, n=20)[-1] if len(previewed) > 1 else previewed[0]
+        print(f"{index:>8} {statistics.mean(latencies):>8.2f} {p95:>8.2f} {max(latencies):>8.2f} "
+              f"{over:>6}/{len(latencies)} {len(previewed):>9} {previewed_p95:>8.2f}")
+        if previewed_p95 > FRAME_MS:
+            raise AssertionError(f"Strategy {index}: previewed keystrokes take {previewed_p95:.1f} ms "
+                                 f"at the 95th percentile, over the {FRAME_MS:.1f} ms budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Membership-test throughput: compiled DFA against Python ``re``.
+
+For each strategy, random {a,b} words are checked with RegexModel.match_many
+and with re.fullmatch on a literal transcription of the same expression.
+
+    python -m benchmarks.bench_matching --words 100000 --length 32
+
+With long words (--length 1000 and up) the nested stars of strategy 13 make
+``re`` backtrack exponentially on non-members; pass --skip-re 13 to leave it out.
+"""
+import argparse
+import random
+import re
+import time
+
+from model import RegexModel
+from regex_ast import render_python
+
+# One representative argument tuple per strategy index
+CASES = {
+    0: ("aba",), 1: ("aba",), 2: ("aba",), 3: ("aba",), 4: ("aa",),
+    5: ("aba",), 6: ("aba",), 7: ("aba",),
+    8: (10,), 9: (10,), 10: (10,), 11: (10,), 12: (32,),
+    13: ("a", 2), 14: ("b", 5), 15: ("a", 5),
+}
+
+
+def random_words(count, length, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("ab") for _ in range(rng.randint(0, length))) for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--length", type=int, default=32, help="maximum word length")
+    parser.add_argument("--skip-re", type=int, nargs="*", default=[],
+                        help="strategy indices to time without re")
+    args = parser.parse_args(argv)
+
+    model = RegexModel()
+    words = random_words(args.words, args.length)
+    total_symbols = sum(map(len, words))
+    print(f"{args.words} words, {total_symbols} symbols")
+    print(f"{'index':>5} {'states':>7} {'dfa words/s':>12} {'re words/s':>12} {'speedup':>8}")
+
+    for index, case_args in CASES.items():
+        node = model.get_strategy(index).build_expression(*case_args)
+        dfa = model.compile(index, *case_args)
+        pattern = re.compile(render_python(node))
+
+        start = time.perf_counter()
+        dfa_results = model.match_many(index, words, *case_args)
+        dfa_elapsed = time.perf_counter() - start
+
+        if index in args.skip_re:
+            print(f"{index:>5} {dfa.num_states:>7} {args.words / dfa_elapsed:>12.0f} {'skipped':>12}")
+            continue
+
+        fullmatch = pattern.fullmatch
+        start = time.perf_counter()
+        re_results = [fullmatch(word) is not None for word in words]
+        re_elapsed = time.perf_counter() - start
+
+        assert dfa_results == re_results, f"results differ for strategy {index}"
+        print(f"{index:>5} {dfa.num_states:>7} {args.words / dfa_elapsed:>12.0f} "
+              f"{args.words / re_elapsed:>12.0f} {re_elapsed / dfa_elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Parsing speed of notation.parse_expression on large generated expressions.
+
+Parses the text of the length-bounded strategies at growing N, in the wide
+formal notation (a top-level union of N + 1 concatenations) and in the
+compact form that nests N levels deep, then renders the result again and
+checks that the same text comes back.  Time per megabyte stays flat as the
+inputs grow, and the deep form parses without touching the recursion limit.
+
+    python -m benchmarks.bench_notation --sizes 200 400 800 --depths 50000 200000 800000
+"""
+import argparse
+import time
+
+from model import RegexModel
+from notation import parse_expression
+from regex_ast import render_formal
+
+
+def cases(sizes, depths):
+    # (label, strategy index, arguments, generation options, renderer that
+    # writes a node the way those options do)
+    for N in sizes:
+        yield f"9 formal N={N}", 9, (N,), {}, None
+    for N in depths:
+        yield (f"11 compact N={N}", 11, (N,), {"compact": True},
+               lambda node: render_formal(node, union_sep="+"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 400, 800])
+    parser.add_argument("--depths", type=int, nargs="+", default=[50_000, 200_000, 800_000])
+    args = parser.parse_args(argv)
+
+    model = RegexModel()
+    print(f"{'case':<20} {'MB':>7} {'tree size':>9} {'parse s':>8} {'MB/s':>7} {'render s':>8} {'round trip':>10}")
+    for label, index, case_args, options, render in cases(args.sizes, args.depths):
+        strategy = model.get_strategy(index)
+        render = render or strategy.render
+        text = strategy.generate_regex(*case_args, **options)
+        megabytes = len(text.encode("utf-8")) / 1e6
+
+        start = time.perf_counter()
+        node = parse_expression(text)
+        parsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        again = render(node)
+        rendered = time.perf_counter() - start
+        print(f"{label:<20} {megabytes:>7.2f} {node.size:>9} {parsed:>8.3f} {megabytes / parsed:>7.2f} "
+              f"{rendered:>8.3f} {'ok' if again == text else 'DIFFERS':>10}")
+
+
+if __name__ == '__main__':
+    main()
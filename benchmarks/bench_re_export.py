@@ -0,0 +1,139 @@
+"""Worst-case ``re`` matching time: exported pattern versus literal transcription.
+
+The cases are strategy outputs plus two hand-written ambiguous expressions
+of the kind the strategies used to emit, (b*ab*)* and (b*ab*ab*)*b*.  For
+every case the benchmark builds adversarial inputs: long runs of a, of b,
+of ab, of aab and a random word, each followed by the shortest suffix that
+makes the word rejected (found on the minimal DFA) and, separately, by a c.
+It times re.match on the exported pattern at each size and prints the worst
+time per input symbol, which stays flat when matching is linear.  The
+literal transcription of the case's own expression (regex_ast.render_python)
+is timed on the same inputs in a subprocess with a timeout, since a
+catastrophic match cannot be interrupted.
+
+    python -m benchmarks.bench_re_export --sizes 1000 4000 16000 64000
+    python -m benchmarks.bench_re_export --literal-sizes 10 15 20 25 30
+"""
+import argparse
+import random
+import re
+import subprocess
+import sys
+import time
+from collections import deque
+
+import model
+import re_export
+from automata import compile_expression, minimize
+from regex_ast import concat, render_python, star, symbols
+
+STRATEGY_CASES = [(3, ("abba",)), (4, ("aa",)), (4, ("abba",)), (9, (50,)), (13, ("a", 2)),
+                  (13, ("ab", 3)), (13, ("aba", 2)), (15, ("a", 10))]
+
+
+def cases():
+    # (label, expression, automaton builder)
+    for index, arguments in STRATEGY_CASES:
+        strategy = model.RegexModel.strategy_classes[index]()
+        yield (f"{index} {', '.join(map(str, arguments))}", strategy.build_expression(*arguments),
+               lambda strategy=strategy, arguments=arguments: strategy.build_automaton(*arguments))
+    a, b = symbols("ab")
+    for label, node in [("(b*ab*)*", star(concat(star(b), a, star(b)))),
+                        ("(b*ab*ab*)*b*", concat(star(concat(star(b), a, star(b), a, star(b))), star(b)))]:
+        yield label, node, lambda node=node: compile_expression(node)
+
+LITERAL = """
+import re, sys, time
+pattern = re.compile(sys.argv[1])
+word = sys.argv[2]
+start = time.perf_counter()
+pattern.match(word)
+print(time.perf_counter() - start)
+"""
+
+
+def breaking_suffix(dfa, prefix):
+    # Shortest continuation of prefix that the DFA rejects, by BFS
+    state = dfa.start
+    for char in prefix:
+        state = dfa.step(state, char)
+    queue = deque([(state, "")])
+    seen = {state}
+    while queue:
+        state, suffix = queue.popleft()
+        if not dfa.accepting[state]:
+            return suffix
+        for char in "ab":
+            target = dfa.step(state, char)
+            if target not in seen:
+                seen.add(target)
+                queue.append((target, suffix + char))
+    return ""
+
+
+def adversarial_words(dfa, size, rng):
+    prefixes = ["a" * size, "b" * size, "ab" * (size // 2), "aab" * (size // 3),
+                "".join(rng.choice("ab") for _ in range(size))]
+    return ([prefix + breaking_suffix(dfa, prefix) for prefix in prefixes]
+            + [prefix + "c" for prefix in prefixes])
+
+
+def time_literal(pattern, word, timeout):
+    try:
+        output = subprocess.run([sys.executable, "-c", LITERAL, pattern, word], capture_output=True,
+                                text=True, timeout=timeout, check=True).stdout
+    except subprocess.TimeoutExpired:
+        return None
+    return float(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 64000])
+    parser.add_argument("--literal-sizes", type=int, nargs="+", default=[10, 20, 30, 40, 1000])
+    parser.add_argument("--literal-timeout", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    print("exported pattern: worst microseconds per input symbol at each size")
+    print(f"{'case':<18} {'route':>7} {'chars':>7} " + " ".join(f"{size:>9}" for size in args.sizes))
+    for label, node, automaton in cases():
+        dfa = minimize(automaton())
+        route = "literal" if re_export.is_unambiguous(node) else "dfa"
+        pattern = re.compile(re_export.expression_to_python(node, automaton))
+        cells = []
+        for size in args.sizes:
+            worst = 0.0
+            for word in adversarial_words(dfa, size, rng):
+                start = time.perf_counter()
+                pattern.match(word)
+                worst = max(worst, (time.perf_counter() - start) / len(word))
+            cells.append(f"{worst * 1e6:>9.3f}")
+        print(f"{label:<18} {route:>7} {len(pattern.pattern):>7} " + " ".join(cells))
+
+    print()
+    print(f"literal transcription: worst seconds per match (timeout {args.literal_timeout:g}s)")
+    print(f"{'case':<18} " + " ".join(f"{size:>9}" for size in args.literal_sizes))
+    for label, node, automaton in cases():
+        dfa = minimize(automaton())
+        literal = r"\A(?:" + render_python(node) + r")\Z"
+        cells = []
+        timed_out = False
+        for size in args.literal_sizes:
+            if timed_out:
+                cells.append(f"{'-':>9}")
+                continue
+            worst = 0.0
+            for word in adversarial_words(dfa, size, rng):
+                elapsed = time_literal(literal, word, args.literal_timeout)
+                if elapsed is None:
+                    timed_out = True
+                    break
+                worst = max(worst, elapsed)
+            cells.append(f"{'timeout':>9}" if timed_out else f"{worst:>9.5f}")
+        print(f"{label:<18} " + " ".join(cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Bit-parallel Shift-And matching versus subset-constructed DFAs.
+
+"The Nth symbol from the last is a" has a 2^N state DFA.  For growing N
+the benchmark reports the DFA size and build time (up to --max-dfa-n) and
+the matching throughput of the DFA, of shift_and.nth_from_last_matcher and
+of the counters.CounterAutomaton that RegexModel.matches() uses for it, on
+random words.  It then compares the DFA and Shift-And on "contains P" and
+"ends with P" for growing |P|, where the DFA stays small.
+
+    python -m benchmarks.bench_shift_and --sizes 4 8 12 16 18 100 1000
+"""
+import argparse
+import random
+import time
+
+import model
+from counters import counter_automaton
+from shift_and import contains_matcher, ends_with_matcher, nth_from_last_matcher
+
+
+def throughput(matcher, words):
+    start = time.perf_counter()
+    matcher.match_many(words)
+    return sum(map(len, words)) / (time.perf_counter() - start) / 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 12, 16, 18, 100, 1000, 10000])
+    parser.add_argument("--pattern-lengths", type=int, nargs="+", default=[4, 64, 1000])
+    parser.add_argument("--max-dfa-n", type=int, default=18)
+    parser.add_argument("--words", type=int, default=50)
+    parser.add_argument("--word-length", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    rng = random.Random(args.seed)
+
+    def random_word(length):
+        return "".join(rng.choice("ab") for _ in range(length))
+
+    words = [random_word(args.word_length) for _ in range(args.words)]
+    nth_from_last = model.RegexModel.strategy_classes[15]()
+
+    print("Nth symbol from the last is 'a'  (throughput in M symbols/s)")
+    print(f"{'N':>6} {'DFA states':>10} {'build s':>8} {'DFA':>7} {'shift-and':>9} {'bits':>6} {'counter':>8}")
+    for N in args.sizes:
+        matcher = nth_from_last_matcher("a", N)
+        counters = counter_automaton(nth_from_last.build_expression("a", N))
+        assert counters.match_many(words) == matcher.match_many(words)
+        if N <= args.max_dfa_n:
+            start = time.perf_counter()
+            dfa = nth_from_last.build_automaton("a", N)
+            built = time.perf_counter() - start
+            assert dfa.match_many(words) == matcher.match_many(words)
+            dfa_cells = f"{dfa.num_states:>10} {built:>8.2f} {throughput(dfa, words):>7.2f}"
+        else:
+            dfa_cells = f"{'-':>10} {'-':>8} {'-':>7}"
+        print(f"{N:>6} {dfa_cells} {throughput(matcher, words):>9.2f} {matcher.num_bits:>6} "
+              f"{throughput(counters, words):>8.0f}")
+
+    print()
+    print("small DFAs: contains P / ends with P  (M symbols/s)")
+    print(f"{'|P|':>6} {'contains DFA':>12} {'shift-and':>9} {'ends DFA':>9} {'shift-and':>9}")
+    for length in args.pattern_lengths:
+        pattern = random_word(length)
+        contains_dfa = model.RegexModel.strategy_classes[3]().build_automaton(pattern)
+        ends_dfa = model.RegexModel.strategy_classes[1]().build_automaton(pattern)
+        contains, ends = contains_matcher(pattern), ends_with_matcher(pattern)
+        # Words that end with the pattern, so the matches are checked too
+        sample = words + [word[:-length] + pattern for word in words]
+        assert contains_dfa.match_many(sample) == contains.match_many(sample)
+        assert ends_dfa.match_many(sample) == ends.match_many(sample)
+        print(f"{length:>6} {throughput(contains_dfa, words):>12.2f} {throughput(contains, words):>9.2f} "
+              f"{throughput(ends_dfa, words):>9.2f} {throughput(ends, words):>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
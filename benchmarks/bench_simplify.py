@@ -0,0 +1,59 @@
+"""Expression size before and after simplify.simplify(), per strategy.
+
+For every strategy and a sweep of its parameters, reports the tree size in
+nodes and the rendered length in characters: the default output of
+generate_regex() against generate_regex(..., simplify=True).  Also shows how
+long the simplification pass itself took.
+
+    python -m benchmarks.bench_simplify --patterns ab abba --sizes 2 10 100
+"""
+import argparse
+import time
+
+import model
+from simplify import simplify
+
+PATTERNS = ["a", "ab", "aba", "abba", "abbab", "abbabaabba"]
+SIZES = [1, 2, 10, 100, 1000]
+
+
+def arguments(index, patterns, sizes):
+    if index in (0, 1, 2, 3, 4, 5, 6, 7):
+        return [(pattern,) for pattern in patterns]
+    if index in (8, 9, 10, 11, 12):
+        return [(N,) for N in sizes]
+    return [(pattern, N) for pattern in patterns for N in sizes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patterns", nargs="+", default=PATTERNS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--strategies", type=int, nargs="+", default=list(range(16)))
+    args = parser.parse_args(argv)
+
+    print(f"{'strategy':>8} {'arguments':<18} {'nodes':>7} {'after':>7} {'chars':>10} {'after':>10} "
+          f"{'ratio':>6} {'ms':>7}")
+    totals = [0, 0]
+    for index in args.strategies:
+        strategy = model.RegexModel.strategy_classes[index]()
+        for arguments_ in arguments(index, args.patterns, args.sizes):
+            try:
+                node = strategy.build_expression(*arguments_)
+            except ValueError:
+                continue
+            start = time.perf_counter()
+            simplified = simplify(node)
+            elapsed = (time.perf_counter() - start) * 1000
+            before = sum(map(len, strategy.iter_tokens(*arguments_)))
+            after = sum(map(len, strategy.iter_tokens(*arguments_, simplify=True)))
+            totals[0] += before
+            totals[1] += after
+            label = ", ".join(map(str, arguments_))
+            print(f"{index:>8} {label[:18]:<18} {node.size:>7} {simplified.size:>7} {before:>10} {after:>10} "
+                  f"{after / before:>6.2f} {elapsed:>7.2f}")
+    print(f"total characters {totals[0]} -> {totals[1]} ({totals[1] / totals[0]:.2f})")
+
+
+if __name__ == '__main__':
+    main()
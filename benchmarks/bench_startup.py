@@ -0,0 +1,85 @@
+"""Startup cost of the headless and GUI entry points.
+
+Each measurement runs in a fresh interpreter so nothing is already
+imported.  For both paths it reports the time to import the entry modules
+and the time until the first regular expression is available, plus the
+wall time of the whole process.  The GUI path uses the offscreen Qt
+platform and is reported as unavailable when PyQt5 is not installed.
+
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEADLESS = """
+import json, sys, time
+start = time.perf_counter()
+from model import RegexModel
+imported = time.perf_counter()
+RegexModel().get_strategy(3).generate_regex("ab")
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "first": done - start,
+                  "qt": "PyQt5" in sys.modules}))
+"""
+
+GUI = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    from PyQt5.QtWidgets import QApplication
+except ImportError:
+    print(json.dumps(None))
+    sys.exit()
+from controller import RegexController
+from view import RegexView
+from model import RegexModel
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+view = RegexView()
+model = RegexModel()
+controller = RegexController(model, view)
+controller.initialize()
+model.get_strategy(3).generate_regex("ab")
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "first": done - start, "qt": True}))
+"""
+
+
+def run(code):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    wall = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    if result is not None:
+        result["wall"] = wall
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'path':<9} {'import ms':>10} {'first result ms':>16} {'process ms':>11} {'loads Qt':>9}")
+    for name, code in (("headless", HEADLESS), ("gui", GUI)):
+        runs = [run(code) for _ in range(args.repeat)]
+        if runs[0] is None:
+            print(f"{name:<9} {'unavailable (PyQt5 is not installed)':>48}")
+            continue
+        median = {key: statistics.median(result[key] for result in runs) * 1000
+                  for key in ("import", "first", "wall")}
+        print(f"{name:<9} {median['import']:>10.1f} {median['first']:>16.1f} {median['wall']:>11.1f} "
+              f"{str(runs[0]['qt']):>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Peak memory of writing a large expression as one string versus streaming.
+
+Each run happens in a fresh interpreter, which writes the expression for
+one N to a file either through generate_regex() (the whole string is built
+first) or through write_regex() (chunks are written as they are rendered).
+Reports the peak resident set size of the process, the output size and the
+time taken.  The default strategy, "length less than N" in its expanded
+form, produces O(N²) characters, so the string mode needs gigabytes for
+N = 10000.
+
+    python -m benchmarks.bench_streaming --sizes 1000 3000 10000
+    python -m benchmarks.bench_streaming --modes stream --index 11
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN = """
+import json, resource, sys, time
+import model
+index, N, mode, path = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], sys.argv[4]
+strategy = model.RegexModel.strategy_classes[index]()
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+with open(path, "w", encoding="utf-8") as target:
+    if mode == "string":
+        written = target.write(strategy.generate_regex(N))
+    else:
+        written = strategy.write_regex(target, N)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"baseline": baseline, "peak": peak, "chars": written, "seconds": elapsed}))
+"""
+
+
+def run(index, N, mode, path):
+    output = subprocess.run([sys.executable, "-c", RUN, str(index), str(N), mode, path], cwd=ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--index", type=int, default=9, help="strategy index (default: length < N)")
+    parser.add_argument("--modes", nargs="+", choices=["string", "stream"], default=["string", "stream"])
+    parser.add_argument("--keep", action="store_true", help="keep the output files")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix="regex-stream-")
+    print(f"{'N':>6} {'mode':>7} {'chars':>12} {'seconds':>8} {'peak RSS MB':>12} {'above start MB':>15}")
+    for N in args.sizes:
+        for mode in args.modes:
+            path = os.path.join(directory, f"{N}-{mode}.txt")
+            try:
+                result = run(args.index, N, mode, path)
+            except subprocess.CalledProcessError as error:
+                # Typically a MemoryError in string mode
+                print(f"{N:>6} {mode:>7} failed: {error.stderr.strip().splitlines()[-1]}")
+                continue
+            finally:
+                if not args.keep and os.path.exists(path):
+                    os.remove(path)
+            print(f"{N:>6} {mode:>7} {result['chars']:>12} {result['seconds']:>8.2f} "
+                  f"{result['peak'] / 1024:>12.1f} {(result['peak'] - result['baseline']) / 1024:>15.1f}")
+    if not args.keep:
+        os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
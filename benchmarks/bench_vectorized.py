@@ -0,0 +1,69 @@
+"""NumPy batch DFA simulation against pure-Python loops.
+
+Times DFA.matches() called per word, DFA.match_many(), and the vectorised
+match_packed() / match_bits() on the same random words (packing time shown
+separately).  Needs NumPy.
+
+    python -m benchmarks.bench_vectorized --words 1000000 10000000 --length 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+import vectorized
+from model import RegexModel
+
+
+def random_words(count, length, seed=0):
+    rng = np.random.default_rng(seed)
+    symbols = rng.integers(0, 2, size=(count, length), dtype=np.uint8)
+    lengths = rng.integers(0, length + 1, size=count)
+    symbols[np.arange(length) >= lengths[:, None]] = vectorized.PAD
+    text = np.array([b"a", b"b", b""])[symbols]
+    return [b"".join(row).decode() for row in text]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--length", type=int, default=16, help="maximum word length")
+    parser.add_argument("--skip-loop", action="store_true", help="leave out the per-word Python loop")
+    args = parser.parse_args(argv)
+
+    model = RegexModel()
+    dfa = model.compile(13, "aba", 3)
+    print(f"DFA with {dfa.num_states} states (# of 'aba' divisible by 3)")
+    print(f"{'words':>9} {'method':>14} {'seconds':>9} {'words/s':>12}")
+    for count in args.words:
+        words = random_words(count, args.length)
+        rows = []
+        if not args.skip_loop:
+            elapsed, expected = timed(lambda: [dfa.matches(word) for word in words])
+            rows.append(("per-word loop", elapsed))
+        elapsed, expected = timed(dfa.match_many, words)
+        rows.append(("match_many", elapsed))
+
+        pack_elapsed, (symbols, lengths) = timed(vectorized.pack_words, words)
+        rows.append(("pack_words", pack_elapsed))
+        elapsed, mask = timed(vectorized.match_packed, dfa, symbols, lengths)
+        rows.append(("match_packed", elapsed))
+        assert mask.tolist() == expected
+
+        bits = vectorized.pack_bits(symbols, lengths)
+        elapsed, mask = timed(vectorized.match_bits, dfa, bits, lengths)
+        rows.append(("match_bits", elapsed))
+        assert mask.tolist() == expected
+
+        for method, elapsed in rows:
+            print(f"{count:>9} {method:>14} {elapsed:>9.3f} {count / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
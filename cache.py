@@ -0,0 +1,135 @@
+"""Bounded LRU memoisation for strategy results.
+
+RegexModel wraps every strategy in a CachedStrategy, so repeated calls with
+the same arguments, from the GUI or from batch jobs, are answered from
+memory.  The cache is bounded both by number of entries and by the total
+size of the cached values, and keeps hit, miss and eviction counters.
+An optional store.ResultStore behind it keeps expensive results on disk.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def value_size(value):
+    """Approximate memory held by a cached value, in bytes"""
+    if hasattr(value, "memory_size"):
+        # Automata and matchers count their own tables
+        return value.memory_size()
+    return sys.getsizeof(value)
+
+
+class GenerationCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, store=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Exceptions from compute propagate and nothing is stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Computed outside the lock so a slow generation does not block
+        # lookups from other threads
+        value = self.store.get(key) if self.store is not None else None
+        if value is None:
+            start = time.perf_counter()
+            value = compute()
+            if self.store is not None and time.perf_counter() - start >= self.store.min_compute_seconds:
+                self.store.put(key, value)
+
+        size = value_size(value)
+        with self._lock:
+            if size <= self.max_bytes and self.max_entries > 0:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._bytes -= previous[1]
+                self._entries[key] = (value, size)
+                self._bytes += size
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def resize(self, max_entries=None, max_bytes=None):
+        """Change either bound, evicting least recently used entries to fit"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            stats = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                     "entries": len(self._entries), "bytes": self._bytes,
+                     "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+        if self.store is not None:
+            stats["store_hits"] = self.store.hits
+            stats["store_misses"] = self.store.misses
+        return stats
+
+
+class CachedStrategy:
+    """Wraps a RegexStrategy so generate_regex and get_description go
+    through a GenerationCache; everything else is passed through."""
+
+    def __init__(self, strategy, cache):
+        self.strategy = strategy
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    def _key(self, method, args, options):
+        return (type(self.strategy).__name__, method, args, tuple(sorted(options.items())))
+
+    def generate_regex(self, *args, **options):
+        return self.cache.get_or_compute(self._key("generate_regex", args, options),
+                                         lambda: self.strategy.generate_regex(*args, **options))
+
+    def get_description(self, *args):
+        return self.cache.get_or_compute(self._key("get_description", args, {}),
+                                         lambda: self.strategy.get_description(*args))
+
+    def build_automaton(self, *args):
+        return self.cache.get_or_compute(self._key("build_automaton", args, {}),
+                                         lambda: self.strategy.build_automaton(*args))
+
+    def build_matcher(self, *args):
+        # Strategies without a matcher of their own match with the automaton
+        if not hasattr(self.strategy, "build_matcher"):
+            return self.build_automaton(*args)
+        return self.cache.get_or_compute(self._key("build_matcher", args, {}),
+                                         lambda: self.strategy.build_matcher(*args))
@@ -0,0 +1,178 @@
+"""Boolean combinations of pattern conditions over several patterns.
+
+A composition is a first clause (predicate, pattern) followed by clauses
+(operation, predicate, pattern), read left to right, e.g.
+
+    ("contains", "ab"), ("and", "ends", "b"), ("but not", "contains", "bb")
+
+for "contains ab and ends with b but not contains bb".  Each predicate has a
+small automaton with at most |P| + 2 states.  ProductAutomaton runs them
+side by side, creating a product state only when a word actually reaches
+it, so neither matching nor full exploration ever visits the unreachable
+part of the (|P1|+2)(|P2|+2)(|P3|+2) state space.
+"""
+import threading
+from array import array
+
+from automata import ALPHABET, DFA, minimize, occurrence_table, to_expression
+from model import PREVIEW_MAX_PATTERN, RegexStrategy
+from tasks import checkpoint
+
+
+def _starts_automaton(pattern):
+    # States 0..m count matched symbols, m accepts forever, m + 1 is dead
+    m = len(pattern)
+    table = array("l")
+    for q in range(m + 2):
+        for char in ALPHABET:
+            if q < m:
+                table.append(q + 1 if pattern[q] == char else m + 1)
+            else:
+                table.append(q)
+    return DFA(table, bytearray([0] * m + [1, 0]))
+
+
+def _ends_automaton(pattern):
+    m = len(pattern)
+    return DFA(occurrence_table(pattern), bytearray([0] * m + [1]))
+
+
+def _contains_automaton(pattern):
+    # The KMP automaton with its match state made an accepting sink
+    m = len(pattern)
+    table = occurrence_table(pattern)
+    table[2 * m] = table[2 * m + 1] = m
+    return DFA(table, bytearray([0] * m + [1]))
+
+
+# Predicate name: (automaton builder, wording in descriptions)
+PREDICATES = {
+    "starts": (_starts_automaton, "starts with"),
+    "ends": (_ends_automaton, "ends with"),
+    "contains": (_contains_automaton, "contains"),
+}
+
+# Operation name: how the language so far combines with the next clause
+OPERATIONS = {
+    "and": lambda left, right: left and right,
+    "or": lambda left, right: left or right,
+    "but not": lambda left, right: left and not right,
+}
+
+
+class ProductAutomaton:
+    """Several DFAs read in lockstep, with the product built on demand.
+
+    A product state is a tuple of component states; it gets a number, a row
+    in the transition table and an accepting flag the first time a word
+    reaches it.  Later words step through the filled table at one lookup
+    per symbol, like DFA.matches().
+    """
+
+    def __init__(self, components, accept):
+        self.components = components
+        self.accept = accept
+        self._number = {}
+        self._states = []
+        # -1 marks a transition not computed yet
+        self._table = array("l")
+        self._accepting = bytearray()
+        self._lock = threading.Lock()
+        self.start = self._intern(tuple(component.start for component in components))
+
+    @property
+    def num_states(self):
+        """Number of product states created so far"""
+        return len(self._states)
+
+    def _intern(self, key):
+        number = self._number.get(key)
+        if number is None:
+            number = self._number[key] = len(self._states)
+            self._states.append(key)
+            self._table.extend((-1, -1))
+            flags = tuple(component.accepting[state] for component, state in zip(self.components, key))
+            self._accepting.append(bool(self.accept(flags)))
+        return number
+
+    def _expand(self, index):
+        # Fill in transition index (2 * state + column) of the table
+        with self._lock:
+            target = self._table[index]
+            if target < 0:
+                state, column = divmod(index, 2)
+                key = tuple(component.table[2 * part + column]
+                            for component, part in zip(self.components, self._states[state]))
+                target = self._table[index] = self._intern(key)
+            return target
+
+    def matches(self, word):
+        """Return True if word is in the language, in O(len(word)) time"""
+        if word.strip(ALPHABET):
+            return False  # Symbols outside {a, b}
+
+        table = self._table
+        state = self.start
+        for code in word.encode("ascii"):
+            index = 2 * state + code - 97
+            state = table[index]
+            if state < 0:
+                state = self._expand(index)
+        return bool(self._accepting[state])
+
+    def match_many(self, words):
+        """Return a list with the result of matches() for each word"""
+        return [self.matches(word) for word in words]
+
+    def to_dfa(self):
+        """Create every reachable product state and return the result as a DFA"""
+        position = 0
+        while position < len(self._states):
+            if not (position + 1) % 1024:
+                checkpoint()
+            for column in (0, 1):
+                if self._table[2 * position + column] < 0:
+                    self._expand(2 * position + column)
+            position += 1
+        return DFA(array("l", self._table), bytearray(self._accepting), self.start)
+
+
+def compose(first, *rest):
+    """Return the ProductAutomaton for a composition of clauses"""
+    clauses = [(None,) + tuple(first)] + [tuple(clause) for clause in rest]
+    components = []
+    operations = []
+    for operation, predicate, pattern in clauses:
+        if predicate not in PREDICATES:
+            raise ValueError(f"Unknown predicate '{predicate}'")
+        if operation is not None and operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{operation}'")
+        components.append(PREDICATES[predicate][0](pattern))
+        if operation is not None:
+            operations.append(OPERATIONS[operation])
+
+    def accept(flags):
+        value = flags[0]
+        for operation, flag in zip(operations, flags[1:]):
+            value = operation(value, flag)
+        return value
+
+    return ProductAutomaton(components, accept)
+
+
+class CompositionStrategy(RegexStrategy):
+    """The language of a composition; the arguments are its clauses"""
+    preview_max_pattern = PREVIEW_MAX_PATTERN
+
+    def build_automaton(self, first, *rest):
+        return minimize(compose(first, *rest).to_dfa())
+
+    def build_expression(self, first, *rest):
+        return to_expression(self.build_automaton(first, *rest))
+
+    def get_description(self, first, *rest):
+        predicate, pattern = first
+        parts = [f"{PREDICATES[predicate][1]} '{pattern}'"]
+        for operation, predicate, pattern in rest:
+            parts.append(f"{operation} {PREDICATES[predicate][1]} '{pattern}'")
+        return " ".join(parts)
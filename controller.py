@@ -1,10 +1,59 @@
-from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtCore import QThreadPool, QTimer
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from worker import GenerationWorker
+
+
+def generate(strategy, args):
+    # Runs on a worker thread
+    return strategy.generate_regex(*args), strategy.get_description(*args)
+
+
+def utf8_size(text, chunk_size=1 << 20):
+    # Encoded in slices so a huge result is never copied whole
+    return sum(len(text[start:start + chunk_size].encode("utf-8"))
+               for start in range(0, len(text), chunk_size))
+
+
+def pattern_symbols(args):
+    # Total length of the patterns among args; a clause has its pattern last
+    return sum(len(arg[-1] if isinstance(arg, tuple) else arg)
+               for arg in args if isinstance(arg, (str, tuple)))
+
+
+def format_size(size):
+    for unit in ("bytes", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1024
 
 
 class RegexController:
+    preview_delay_ms = 150
+    # Characters of the expression shown at first and per Show More click
+    page_chars = 20000
+    # Characters written per call when saving to a file
+    save_chunk_chars = 1 << 20
+
     def __init__(self, model, view):
         self.model = model
         self.view = view
+        self.thread_pool = QThreadPool.globalInstance()
+        # Incremented for every Generate and Cancel click; results from a
+        # worker started under an older number are dropped
+        self.generation = 0
+        self.worker = None
+        self.generating_index = None
+        self.generating_preview = False
+        self.result_regex = ""
+        self.result_size = 0
+        self.result_shown = 0
+
+        # Live preview regenerates once typing pauses for this long
+        self.preview_timer = QTimer()
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(self.preview_delay_ms)
+        self.preview_timer.timeout.connect(self.on_preview_timeout)
         self.connect_signals()
 
     def initialize(self):
@@ -19,6 +68,10 @@ class RegexController:
         self.view.pattern_combo.currentIndexChanged.connect(self.on_pattern_changed)
         self.view.generate_button.clicked.connect(self.on_generate_clicked)
         self.view.clear_button.clicked.connect(self.on_clear_clicked)
+        self.view.cancel_button.clicked.connect(self.on_cancel_clicked)
+        self.view.show_more_button.clicked.connect(self.on_show_more_clicked)
+        self.view.copy_all_button.clicked.connect(self.on_copy_all_clicked)
+        self.view.save_button.clicked.connect(self.on_save_clicked)
 
         # Connect input validation
         self.view.pattern_input.textChanged.connect(self.on_pattern_input_changed)
@@ -27,6 +80,12 @@ class RegexController:
         self.view.pattern_input_p2.textChanged.connect(self.on_pattern_input_p2_changed)
         self.view.pattern_input_p3.textChanged.connect(self.on_pattern_input_p3_changed)
 
+        # Live preview
+        self.view.live_preview_checkbox.toggled.connect(self.schedule_preview)
+        self.view.number_input.valueChanged.connect(self.schedule_preview)
+        self.view.number_input2.valueChanged.connect(self.schedule_preview)
+        self.view.combine_combo.currentIndexChanged.connect(self.schedule_preview)
+
     def on_pattern_changed(self, index):
         # Update explanation
         self.view.set_explanation(self.model.get_explanation(index))
@@ -45,63 +104,86 @@ class RegexController:
             self.view.set_input_widget(3)
             self.view.set_focus(3)
 
+        self.schedule_preview()
+
     def on_pattern_input_changed(self, text):
         validated = self.model.validate_pattern(text)
         if validated != text:
             self.view.set_pattern_input(validated)
+        self.schedule_preview()
 
     def on_pattern_input2_changed(self, text):
         validated = self.model.validate_pattern(text)
         if validated != text:
             self.view.set_pattern_input2(validated)
+        self.schedule_preview()
 
     def on_pattern_input_p1_changed(self, text):
         validated = self.model.validate_pattern(text)
         if validated != text:
             self.view.set_pattern_input_p1(validated)
+        self.schedule_preview()
 
     def on_pattern_input_p2_changed(self, text):
         validated = self.model.validate_pattern(text)
         if validated != text:
             self.view.set_pattern_input_p2(validated)
+        self.schedule_preview()
 
     def on_pattern_input_p3_changed(self, text):
         validated = self.model.validate_pattern(text)
         if validated != text:
             self.view.set_pattern_input_p3(validated)
+        self.schedule_preview()
+
+    def schedule_preview(self, *args):
+        # Every change restarts the timer, so a burst of keystrokes leads to
+        # a single generation
+        if self.view.is_live_preview():
+            self.preview_timer.start()
+
+    def on_preview_timeout(self):
+        self.request_generation(preview=True)
 
     def on_generate_clicked(self):
+        self.preview_timer.stop()
+        self.request_generation(preview=False)
+
+    def request_generation(self, preview):
+        # Incomplete input is reported for Generate clicks and ignored for
+        # previews, which run while the user is still typing
+        self.view.set_preview_note("")
         pattern_index = self.view.get_current_pattern_index()
         strategy = self.model.get_strategy(pattern_index)
 
         if not strategy:
-            QMessageBox.warning(self.view, 'Error', 'No strategy found for this pattern.')
+            if not preview:
+                QMessageBox.warning(self.view, 'Error', 'No strategy found for this pattern.')
             return
 
         # Get inputs based on pattern type
         if pattern_index in [0, 1, 2, 3, 4]:  # Patterns requiring only P
             pattern = self.view.get_pattern_input()
             if not pattern:
-                QMessageBox.warning(self.view, 'Input Error', 'Please enter a pattern first.')
+                if not preview:
+                    QMessageBox.warning(self.view, 'Input Error', 'Please enter a pattern first.')
                 return
 
-            regex = strategy.generate_regex(pattern)
-            desc = strategy.get_description(pattern)
+            args = (pattern,)
 
         elif pattern_index in [8, 9, 10, 11, 12]:  # Patterns requiring only N
             N = self.view.get_number_input()
-            regex = strategy.generate_regex(N)
-            desc = strategy.get_description(N)
+            args = (N,)
 
         elif pattern_index in [13, 14, 15]:  # Patterns requiring both P and N
             pattern = self.view.get_pattern_input2()
             N = self.view.get_number_input2()
             if not pattern:
-                QMessageBox.warning(self.view, 'Input Error', 'Please enter a pattern first.')
+                if not preview:
+                    QMessageBox.warning(self.view, 'Input Error', 'Please enter a pattern first.')
                 return
 
-            regex = strategy.generate_regex(pattern, N)
-            desc = strategy.get_description(pattern, N)
+            args = (pattern, N)
 
         else:  # Patterns requiring multiple patterns (5, 6, 7)
             p1 = self.view.get_pattern_input_p1()
@@ -109,29 +191,118 @@ class RegexController:
             p3 = self.view.get_pattern_input_p3()
 
             if not p1 or not p2:
-                QMessageBox.warning(self.view, 'Input Error', 'Please enter at least two patterns.')
+                if not preview:
+                    QMessageBox.warning(self.view, 'Input Error', 'Please enter at least two patterns.')
                 return
 
-            # For patterns 5-7, we only use the first pattern
-            regex = strategy.generate_regex(p1)
-            desc = strategy.get_description(p1)
+            # P1 is the pattern to contain, P2 the one to start and/or end
+            # with; P3 adds a clause through the product automaton
+            strategy = self.model.get_composition()
+            args = self.model.composition_clauses(pattern_index, p1, p2, p3, self.view.get_combine_operation())
 
-        # Display the result
+        # Strategies built by state elimination redo it for every keystroke,
+        # so their preview stops once the patterns get long
+        limit = strategy.preview_max_pattern
+        if preview and limit is not None and pattern_symbols(args) > limit:
+            self.view.set_preview_note(
+                f"Live preview pauses above {limit} pattern symbols; press Generate.")
+            return
+
+        # A newer request supersedes the running one: stop it and drop its result
+        self.cancel_worker()
+        self.generation += 1
+        self.worker = GenerationWorker(self.generation, generate, strategy, args)
+        self.generating_index = pattern_index
+        self.generating_preview = preview
+        self.worker.signals.finished.connect(self.on_generation_finished)
+        self.worker.signals.failed.connect(self.on_generation_failed)
+        self.worker.signals.progress.connect(self.on_generation_progress)
+        self.view.set_busy(True)
+        self.thread_pool.start(self.worker)
+
+    def cancel_worker(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
+
+    def on_cancel_clicked(self):
+        self.cancel_worker()
+        self.generation += 1
+        self.view.set_busy(False)
+
+    def on_generation_progress(self, generation, done, total):
+        if generation == self.generation:
+            self.view.set_progress(done, total)
+
+    def on_generation_failed(self, generation, message):
+        if generation != self.generation:
+            return
+        self.worker = None
+        self.view.set_busy(False)
+        if not self.generating_preview:
+            QMessageBox.warning(self.view, 'Error', message)
+
+    def on_generation_finished(self, generation, result):
+        if generation != self.generation:
+            return
+        pattern_index = self.generating_index
+        self.worker = None
+        self.view.set_busy(False)
+        regex, desc = result
+
+        # Display the result.  Only the header is HTML; the expression goes
+        # to a plain text view a page at a time.
         pattern_type = self.model.get_patterns()[pattern_index]
         result_text = f"""
         <h3>Generated Regular Expression</h3>
         <p>For <b>{pattern_type}</b></p>
-        <p>The regular expression is:</p>
-        <div style="background-color: #f0f0f0; padding: 15px; border-radius: 5px; font-family: monospace; font-size: 16px;">
-            {regex}
-        </div>
-        <p style="margin-top: 15px;">This regular expression will match any string that {desc}.</p>
+        <p>This regular expression will match any string that {desc}.</p>
         """
 
         self.view.set_results(result_text)
+        self.result_regex = regex
+        self.result_size = utf8_size(regex)  # Measured once, not per page
+        self.result_shown = 0
+        self.show_next_page()
+
+    def show_next_page(self):
+        regex = self.result_regex
+        page = regex[self.result_shown:self.result_shown + self.page_chars]
+        self.view.set_regex_page(page, append=self.result_shown > 0)
+        self.result_shown += len(page)
+
+        stats = f"{len(regex):,} characters, {format_size(self.result_size)}"
+        if self.result_shown < len(regex):
+            stats += f" (showing the first {self.result_shown:,})"
+        self.view.set_result_stats(stats)
+        self.view.set_result_actions_enabled(True, self.result_shown < len(regex))
+
+    def on_show_more_clicked(self):
+        self.show_next_page()
+
+    def on_copy_all_clicked(self):
+        QApplication.clipboard().setText(self.result_regex)
+
+    def on_save_clicked(self):
+        path = self.view.get_save_path()
+        if not path:
+            return
+        regex = self.result_regex
+        try:
+            with open(path, "w", encoding="utf-8") as target:
+                for start in range(0, len(regex), self.save_chunk_chars):
+                    target.write(regex[start:start + self.save_chunk_chars])
+        except OSError as error:
+            QMessageBox.warning(self.view, 'Save Error', str(error))
 
     def on_clear_clicked(self):
+        self.on_cancel_clicked()
         self.view.clear_inputs()
+        self.result_regex = ""
+        self.result_size = 0
+        self.result_shown = 0
+        # Clearing the inputs is not an edit to preview
+        self.preview_timer.stop()
 
         # Set focus to the appropriate input based on current pattern
         pattern_index = self.view.get_current_pattern_index()
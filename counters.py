@@ -0,0 +1,243 @@
+"""Counting automata for expressions built from bounded repetitions.
+
+Unrolling x^{N} into an automaton costs N copies of x's states, so the
+length strategies' (a+b)^{N} compile to N+1 states.  A counting automaton
+keeps one state per repeated block instead, plus an integer counter of
+the repetitions read so far, with the bounds as guards:
+
+    (a+b)^{N}(a+b)*          one state, leave after at least N symbols
+    (a+b)^{N-1}ab(a+b)*      states for (a+b) x N-1, ab x 1, (a+b) x 0..∞
+
+counter_automaton() accepts expressions that are concatenations of such
+blocks, where a block is a fixed sequence of symbol classes ((a+b), (ab),
+...) repeated between lo and hi times (hi may be unbounded: x*), written
+as x^{N}, x*, or a union of powers of x with consecutive exponents.
+
+With at most one block whose count can vary, the run is deterministic:
+the word length fixes every counter, so a block's symbols are found by
+slicing instead of stepping through states.  Matching checks each column
+of each block once, which is linear in the word, and skips (a+b) columns
+entirely, so (a+b)^{1000} costs nothing beyond the length test.  Memory
+is proportional to the number of blocks, whatever N is.
+"""
+import sys
+
+from automata import ALPHABET
+from regex_ast import Concat, Empty, Epsilon, Star, Symbol, Union
+from tasks import checkpoint
+
+
+def _flatten(segments):
+    # The block of a sequence of fixed-count segments, written out once
+    block = ()
+    for classes, low, _ in segments:
+        block += classes * low
+    return block
+
+
+def _merge(segments):
+    # Adjacent segments repeating the same block become one
+    merged = []
+    for segment in segments:
+        if merged and merged[-1][0] == segment[0]:
+            classes, low, high = merged[-1]
+            merged[-1] = (classes, low + segment[1],
+                          None if high is None or segment[2] is None else high + segment[2])
+        elif segment[1] or segment[2] != 0:
+            merged.append(segment)
+    return merged
+
+
+def _union_segments(node, parts):
+    # A union of single symbols is a class; a union of repetitions of the
+    # same block is that block with the combined bounds, if they leave no gap
+    if all(item.__class__ is Symbol for item in node.items):
+        return [(("".join(sorted({item.char for item in node.items})),), 1, 1)]
+    block = None
+    bounds = []
+    for segments in parts:
+        if not segments:
+            bounds.append((0, 0))
+            continue
+        if len(segments) > 1 or (block is not None and segments[0][0] != block):
+            raise ValueError("The union is not a repetition of a single block")
+        block, low, high = segments[0]
+        bounds.append((low, high))
+    if block is None:
+        return []
+    bounds.sort(key=lambda bound: bound[0])
+    low, high = bounds[0]
+    for next_low, next_high in bounds[1:]:
+        if high is not None and next_low > high + 1:
+            raise ValueError("The union has a gap between its repetition counts")
+        high = None if high is None or next_high is None else max(high, next_high)
+    return [(block, low, high)]
+
+
+def _repeated_segments(node, segments):
+    # x* and x^{n} of a block
+    fixed = all(low == high for _, low, high in segments)
+    if node.__class__ is Star:
+        if fixed:
+            block = _flatten(segments)
+            return [(block, 0, None)] if block else []
+        if len(segments) == 1 and segments[0][1] <= 1:
+            return [(segments[0][0], 0, None)]  # Every count is a sum of counts in [lo, hi]
+        raise ValueError("The starred expression does not repeat a single block")
+    count = node.count
+    if not count:
+        return []
+    if len(segments) == 1:
+        block, low, high = segments[0]
+        return [(block, low * count, None if high is None else high * count)]
+    if fixed:
+        block = _flatten(segments)
+        return [(block, count, count)] if block else []
+    raise ValueError("The repeated expression has a block of varying count")
+
+
+def _segments(root):
+    # segments[node]: list of (block, lo, hi) for node, where block is a
+    # tuple of symbol classes (strings of allowed symbols) and hi is None
+    # for no upper bound.  Walks the tree bottom-up without recursion.
+    memo = {}
+    stack = [root]
+    steps = 0
+    while stack:
+        node = stack[-1]
+        if node in memo:
+            stack.pop()
+            continue
+        pending = [child for child in node.children() if child not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        steps += 1
+        if not steps % 4096:
+            checkpoint()
+        cls = node.__class__
+        if cls is Symbol:
+            memo[node] = [((node.char,), 1, 1)]
+        elif cls is Epsilon:
+            memo[node] = []
+        elif cls is Empty:
+            memo[node] = [(("",), 1, 1)]  # A class no symbol belongs to
+        elif cls is Concat:
+            memo[node] = _merge([segment for item in node.items for segment in memo[item]])
+        elif cls is Union:
+            memo[node] = _union_segments(node, [memo[item] for item in node.items])
+        else:
+            memo[node] = _merge(_repeated_segments(node, memo[node.item]))
+    return memo[root]
+
+
+def _checks(segments):
+    # What fixed segments laid out from offset 0 require of a word: literal
+    # (offset, text) runs for blocks of single symbols read once, and
+    # (offset, step, count, class) slices that may only hold symbols of
+    # class for the rest; (a+b) needs no check
+    literals = []
+    columns = []
+    offset = 0
+    for classes, count, _ in segments:
+        width = len(classes)
+        if count == 1 and all(len(allowed) == 1 for allowed in classes):
+            text = "".join(classes)
+            if literals and literals[-1][0] + len(literals[-1][1]) == offset:
+                literals[-1] = (literals[-1][0], literals[-1][1] + text)
+            else:
+                literals.append((offset, text))
+        else:
+            for position, allowed in enumerate(classes):
+                if allowed != ALPHABET and count:
+                    columns.append((offset + position, width, count, allowed))
+        offset += width * count
+    return literals, columns, offset
+
+
+def _holds(word, start, checks):
+    # Whether word meets the (literals, columns) of _checks from start
+    literals, columns = checks
+    for offset, text in literals:
+        if not word.startswith(text, start + offset):
+            return False
+    for offset, width, count, allowed in columns:
+        offset += start
+        if word[offset:offset + width * count:width].strip(allowed):
+            return False
+    return True
+
+
+class CounterAutomaton:
+    """Matcher for a chain of counted blocks, at most one of varying count.
+
+    ``segments`` lists (block, lo, hi) in order; the automaton has one
+    state per segment and a counter for the repetitions of its block.
+    """
+    __slots__ = ("segments", "prefix", "prefix_length", "suffix", "suffix_length", "middle")
+
+    def __init__(self, segments):
+        self.segments = tuple(segments)
+        varying = [position for position, (_, low, high) in enumerate(self.segments) if low != high]
+        if len(varying) > 1:
+            raise ValueError("A counting automaton supports one block of varying count")
+        split = varying[0] if varying else len(self.segments)
+        self.middle = self.segments[split] if varying else None
+        # The checks of the fixed segments before and after the varying one
+        literals, columns, self.prefix_length = _checks(self.segments[:split])
+        self.prefix = (literals, columns)
+        literals, columns, self.suffix_length = _checks(self.segments[split + 1:])
+        self.suffix = (literals, columns)
+
+    @property
+    def num_states(self):
+        return len(self.segments)
+
+    def memory_size(self):
+        parts = [self.segments, self.prefix, self.suffix]
+        parts.extend(self.segments)
+        parts.extend(segment[0] for segment in self.segments)
+        for literals, columns in (self.prefix, self.suffix):
+            parts.extend((literals, columns))
+            parts.extend(literals)
+            parts.extend(columns)
+        return sys.getsizeof(self) + sum(map(sys.getsizeof, parts))
+
+    def matches(self, word):
+        """Return True if word is in the language, in O(len(word)) time"""
+        if word.strip(ALPHABET):
+            return False  # Symbols outside {a, b}
+        length = len(word)
+        rest = length - self.prefix_length - self.suffix_length
+        if self.middle is None:
+            if rest:
+                return False
+        else:
+            # The length left for the varying block fixes its counter
+            classes, low, high = self.middle
+            width = len(classes)
+            if rest < 0 or rest % width:
+                return False
+            count = rest // width
+            if count < low or (high is not None and count > high):
+                return False
+            start = self.prefix_length
+            for position, allowed in enumerate(classes):
+                if allowed != ALPHABET and word[start + position:start + rest:width].strip(allowed):
+                    return False
+        return _holds(word, 0, self.prefix) and _holds(word, length - self.suffix_length, self.suffix)
+
+    def match_many(self, words):
+        """Return a list with the result of matches() for each word"""
+        return [self.matches(word) for word in words]
+
+    def __repr__(self):
+        return f"<CounterAutomaton states={self.num_states}>"
+
+
+def counter_automaton(node):
+    """Return the CounterAutomaton for an expression, or raise ValueError if
+    it is not a chain of counted blocks with at most one varying count"""
+    return CounterAutomaton(_segments(node))
@@ -0,0 +1,224 @@
+"""Exact counts of the words of each length, and uniform random sampling.
+
+|L ∩ Σⁿ| is the number of paths of length n from the start to a final
+state.  With M the transfer matrix of the minimal DFA (M[s][t] symbols lead
+from s to t), it is the start row of Mⁿ times the final-state vector:
+count_words() computes it by repeated squaring, O(Q³ log n) multiplications
+for Q states, or, for larger automata, by stepping a count vector n times.
+Counts are exact integers, or residues with a modulus.
+
+Sampler draws words of one length uniformly.  Building it runs the count
+vector from the end of the word back to the start once and keeps, for every
+position and state, the probability of reading an a next; every sample is
+then a single O(n) walk.  When that table would be too large, only some of
+the count vectors are kept and the rows between them are recomputed for
+each batch of samples.  The probabilities are doubles rounded from the
+exact counts, so each step is off by at most 2^-53 relative and a word's
+probability by about n·2^-53.
+"""
+import random
+from array import array
+
+from automata import ALPHABET, minimize
+from tasks import checkpoint
+
+# Exact counts use matrix powers up to this many states and a count vector
+# beyond, where multiplying Q x Q matrices of n-bit numbers costs more than
+# n steps of additions.  With a modulus the entries stay small and matrix
+# powers win whenever Q² log n < n.
+MATRIX_STATES = 16
+
+# Sampler keeps the probabilities for every position up to this size, and
+# the count vectors it recomputes them from up to the second
+SAMPLER_TABLE_BYTES = 64 << 20
+SAMPLER_MAX_BYTES = 256 << 20
+
+
+def _check_length(length):
+    if length < 0:
+        raise ValueError(f"Words cannot have length {length}")
+
+
+def _transfer_matrix(dfa):
+    size = dfa.num_states
+    matrix = [[0] * size for _ in range(size)]
+    for state in range(size):
+        for column in (0, 1):
+            matrix[state][dfa.table[2 * state + column]] += 1
+    return matrix
+
+
+def _multiply(left, right, modulus):
+    columns = list(zip(*right))
+    product = []
+    for row in left:
+        if modulus is None:
+            product.append([sum(x * y for x, y in zip(row, column) if x and y) for column in columns])
+        else:
+            product.append([sum(x * y for x, y in zip(row, column)) % modulus for column in columns])
+    return product
+
+
+def _completions(dfa, vector, modulus):
+    # One step back: words one symbol longer from each state
+    table = dfa.table
+    if modulus is None:
+        return [vector[table[2 * state]] + vector[table[2 * state + 1]] for state in range(len(vector))]
+    return [(vector[table[2 * state]] + vector[table[2 * state + 1]]) % modulus for state in range(len(vector))]
+
+
+def count_words(dfa, length, modulus=None):
+    """Return the number of words of the given length that dfa accepts,
+    reduced modulo modulus when one is given"""
+    _check_length(length)
+    dfa = minimize(dfa)
+    finals = [int(final) for final in dfa.accepting]
+    size = dfa.num_states
+    if modulus is None:
+        use_matrix = size <= MATRIX_STATES
+    else:
+        use_matrix = size * size * length.bit_length() < length
+    if not use_matrix:
+        vector = finals
+        for step in range(length):
+            if not (step + 1) % 256:
+                checkpoint()
+            vector = _completions(dfa, vector, modulus)
+        count = vector[dfa.start]
+    else:
+        # Apply the bits of length from the lowest: vector = M^(bits so far)
+        # times the final-state vector
+        power = _transfer_matrix(dfa)
+        vector = finals
+        remaining = length
+        while remaining:
+            checkpoint()
+            if remaining & 1:
+                vector = [sum(x * y for x, y in zip(row, vector)) for row in power]
+                if modulus is not None:
+                    vector = [value % modulus for value in vector]
+            remaining >>= 1
+            if remaining:
+                power = _multiply(power, power, modulus)
+        count = vector[dfa.start]
+    return count if modulus is None else count % modulus
+
+
+def count_words_up_to(dfa, length, modulus=None):
+    """Return [|L ∩ Σ⁰|, ..., |L ∩ Σ^length|] in one pass"""
+    _check_length(length)
+    dfa = minimize(dfa)
+    # vector[s] is the number of words of the current length leading from
+    # the start to s
+    table = dfa.table
+    vector = [0] * dfa.num_states
+    vector[dfa.start] = 1
+    counts = []
+    for step in range(length + 1):
+        if not (step + 1) % 256:
+            checkpoint()
+        total = sum(value for state, value in enumerate(vector) if dfa.accepting[state])
+        counts.append(total if modulus is None else total % modulus)
+        following = [0] * len(vector)
+        for state, value in enumerate(vector):
+            if value:
+                following[table[2 * state]] += value
+                following[table[2 * state + 1]] += value
+        vector = following if modulus is None else [value % modulus for value in following]
+    return counts
+
+
+def _ratio(part, whole):
+    # part / whole as a double, from the leading bits of both
+    shift = max(whole.bit_length() - 64, 0)
+    return (part >> shift) / (whole >> shift)
+
+
+class Sampler:
+    """Uniformly random members of a DFA's language of one length.
+
+    The probabilities of reading an a are kept for every position when
+    they fit in SAMPLER_TABLE_BYTES.  Beyond that only every block-th count
+    vector is kept, and the rows of a block are recomputed from it while
+    the words walk through that block: samples() draws a whole batch in
+    one such pass, O(n·Q) steps, so prefer it to repeated sample() calls.
+    Raises ValueError if the kept vectors could exceed SAMPLER_MAX_BYTES.
+    """
+
+    def __init__(self, dfa, length):
+        _check_length(length)
+        dfa = minimize(dfa)
+        self.dfa = dfa
+        self.length = length
+        size = dfa.num_states
+        self._size = size
+        # A block of probability rows fits in SAMPLER_TABLE_BYTES, and a whole
+        # table is a single block
+        self._block = max(min(SAMPLER_TABLE_BYTES // (8 * size), length), 1)
+        # Count vector c holds numbers of up to c * block bits
+        kept = sum(size * (32 + index * self._block // 8) for index in range(-(-length // self._block)))
+        if kept > SAMPLER_MAX_BYTES:
+            raise ValueError(f"Sampling words of length {length} from a {size}-state automaton would keep "
+                             f"about {kept >> 20} MB of counts, over the {SAMPLER_MAX_BYTES >> 20} MB limit")
+
+        # checkpoints[c]: words of c * block symbols from each state to a
+        # final one.  A single block's rows are computed once and kept.
+        vector = [int(final) for final in dfa.accepting]
+        self._checkpoints = [vector]
+        self._rows = None
+        if length <= self._block:
+            self._rows, vector = self._block_rows(0)
+        for remaining in range(1, length + 1 if self._rows is None else 0):
+            if not remaining % 256:
+                checkpoint()
+            vector = _completions(dfa, vector, None)
+            if not remaining % self._block and remaining < length:
+                self._checkpoints.append(vector)
+        self.count = vector[dfa.start]
+
+    def _block_rows(self, index):
+        # rows[(remaining - first - 1) * size + state]: chance of reading an
+        # a from state when remaining symbols are still to come, for the
+        # remaining in block index, first + 1 .. first + block; and the count
+        # vector for the last of them
+        table = self.dfa.table
+        size = self._size
+        first = index * self._block
+        vector = self._checkpoints[index]
+        rows = array("d", [0.0]) * (size * min(self._block, self.length - first))
+        for row in range(0, len(rows), size):
+            if not (row // size + 1) % 256:
+                checkpoint()
+            following = _completions(self.dfa, vector, None)
+            for state in range(size):
+                total = following[state]
+                if total:
+                    rows[row + state] = _ratio(vector[table[2 * state]], total)
+            vector = following
+        return rows, vector
+
+    def sample(self, rng=random):
+        """Return one word of the language of the sampler's length, chosen
+        uniformly at random.  Raises ValueError if there is none."""
+        return self.samples(1, rng)[0]
+
+    def samples(self, count, rng=random):
+        """Return a list of count independent samples"""
+        if not self.count:
+            raise ValueError(f"The language has no words of length {self.length}")
+        table = self.dfa.table
+        size = self._size
+        uniform = rng.random
+        states = [self.dfa.start] * count
+        words = [[] for _ in range(count)]
+        for index in reversed(range(len(self._checkpoints))):
+            rows = self._rows if self._rows is not None else self._block_rows(index)[0]
+            top = len(rows) - size
+            for number, chars in enumerate(words):
+                state = states[number]
+                for row in range(top, -1, -size):
+                    column = 0 if uniform() < rows[row + state] else 1
+                    chars.append(ALPHABET[column])
+                    state = table[2 * state + column]
+                states[number] = state
+        return ["".join(chars) for chars in words]
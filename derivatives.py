@@ -0,0 +1,191 @@
+"""Brzozowski derivatives and a DFA built from them on demand.
+
+The derivative of an expression by a symbol c is an expression for the
+words w such that cw is in the language, so a word is matched by taking
+derivatives symbol by symbol and checking whether the last one accepts
+the empty word.  Once unions are flattened, deduplicated and put in a
+fixed order (and concatenation flattened, with the ε and ∅ identities),
+an expression has only finitely many distinct derivatives: they are the
+states of a DFA for its language.
+
+LazyDFA creates those states as words reach them, so only the part of the
+DFA a workload visits is ever built.  That is what a short word needs from
+an expression whose full DFA is exponential, such as (a+b)*a(a+b)^{N-1}.
+The transition table is bounded; when it fills up it is flushed and
+refilled from the state being read.
+"""
+import threading
+from array import array
+
+from automata import ALPHABET
+from regex_ast import EMPTY, EPSILON, Concat, Empty, Epsilon, Power, Star, Symbol, Union, concat, power
+from tasks import checkpoint
+
+# States a LazyDFA keeps before it flushes its table
+LAZY_MAX_STATES = 10_000
+
+
+def _union(items):
+    # Union in canonical form: nested unions flattened, ∅ and duplicates
+    # dropped, alternatives ordered by uid
+    flat = set()
+    for item in items:
+        if item.__class__ is Union:
+            flat.update(item.items)
+        elif item is not EMPTY:
+            flat.add(item)
+    if not flat:
+        return EMPTY
+    if len(flat) == 1:
+        return flat.pop()
+    return Union(*sorted(flat, key=lambda item: item.uid))
+
+
+def _needed(node):
+    # The children whose derivatives the derivative of node is made of
+    cls = node.__class__
+    if cls is Union:
+        return node.items
+    if cls is Concat:
+        for position, item in enumerate(node.items):
+            if not item.nullable:
+                return node.items[:position + 1]
+        return node.items
+    if cls is Star or cls is Power:
+        return (node.item,)
+    return ()
+
+
+def derivative(root, char):
+    """Return the derivative of root by the symbol char, in canonical form"""
+    memo = {}
+    stack = [root]
+    steps = 0
+    while stack:
+        node = stack[-1]
+        if node in memo:
+            stack.pop()
+            continue
+        pending = [child for child in _needed(node) if child not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        steps += 1
+        if not steps % 4096:
+            checkpoint()
+        cls = node.__class__
+        if cls is Symbol:
+            memo[node] = EPSILON if node.char == char else EMPTY
+        elif cls is Epsilon or cls is Empty:
+            memo[node] = EMPTY
+        elif cls is Union:
+            memo[node] = _union([memo[item] for item in node.items])
+        elif cls is Concat:
+            # d(x1...xk) = d(x1)x2...xk + d(x2)x3...xk + ... while the
+            # factors before are nullable
+            items = node.items
+            memo[node] = _union([concat(memo[items[position]], *items[position + 1:])
+                                 for position in range(len(_needed(node)))])
+        elif cls is Star:
+            memo[node] = concat(memo[node.item], node)
+        elif node.count == 0:
+            memo[node] = EMPTY
+        else:
+            # d(x^{n}) = d(x)x^{n-1}, also for nullable x since x^{k} is then
+            # contained in x^{n-1} for every k < n
+            memo[node] = concat(memo[node.item], power(node.item, node.count - 1))
+    return memo[root]
+
+
+class _Table:
+    # One filling of a LazyDFA's table.  states[i] is the expression of
+    # state i, the start expression is state 0 and -1 marks a transition
+    # not computed yet.
+
+    def __init__(self, start):
+        self.states = []
+        self.number = {}
+        self.table = array("l")
+        self.accepting = bytearray()
+        self.intern(start)
+
+    def intern(self, node):
+        number = self.number.get(node)
+        if number is None:
+            number = self.number[node] = len(self.states)
+            self.states.append(node)
+            self.table.extend((-1, -1))
+            self.accepting.append(node.nullable)
+        return number
+
+
+class LazyDFA:
+    """The DFA of an expression's derivatives, built as words are read.
+
+    Matching a word costs one table lookup per symbol once the states it
+    passes through exist and one derivative per new transition before.  At
+    most max_states states are kept: a transition that would create one
+    more starts a new table holding the start state and its target, and
+    ``flushes`` counts how often that happened.
+    """
+
+    def __init__(self, node, max_states=LAZY_MAX_STATES):
+        if max_states < 2:
+            raise ValueError("A lazy DFA needs room for at least two states")
+        self.node = node
+        self.max_states = max_states
+        self.flushes = 0
+        self._current = _Table(node)
+        self._lock = threading.Lock()
+
+    @property
+    def num_states(self):
+        """Number of states in the current table"""
+        return len(self._current.states)
+
+    def _expand(self, filling, index):
+        # Fill in transition index (2 * state + column) of filling and
+        # return the table to continue in with the target state.  filling
+        # may be older than the current table if another thread flushed it;
+        # it is still a valid part of the DFA, only no longer extended.
+        with self._lock:
+            target = filling.table[index]
+            if target >= 0:
+                return filling, target
+            state, column = divmod(index, 2)
+            node = derivative(filling.states[state], ALPHABET[column])
+            current = self._current
+            target = current.number.get(node)
+            if target is None and len(current.states) >= self.max_states:
+                current = self._current = _Table(self.node)
+                self.flushes += 1
+            if filling is current:
+                target = filling.table[index] = current.intern(node)
+            else:
+                target = current.intern(node)
+            return current, target
+
+    def matches(self, word):
+        """Return True if word is in the language"""
+        if word.strip(ALPHABET):
+            return False  # Symbols outside {a, b}
+
+        filling = self._current
+        table = filling.table
+        state = 0
+        for code in word.encode("ascii"):
+            index = 2 * state + code - 97
+            state = table[index]
+            if state < 0:
+                filling, state = self._expand(filling, index)
+                table = filling.table
+        return bool(filling.accepting[state])
+
+    def match_many(self, words):
+        """Return a list with the result of matches() for each word"""
+        return [self.matches(word) for word in words]
+
+    def __repr__(self):
+        return f"<LazyDFA states={self.num_states} flushes={self.flushes}>"
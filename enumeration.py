@@ -0,0 +1,120 @@
+"""Shortlex enumeration of the words a DFA accepts.
+
+Words come out shortest first and, within a length, in lexicographic order
+with a < b.  Each length is walked depth first through the DFA, taking a
+branch only if some word of the remaining length leads from it to a final
+state, so no dead end is ever explored and a length's words are produced
+one at a time rather than collected.  The number of such words, per state
+and remaining length, also lets an offset skip whole lengths and whole
+subtrees without visiting them: starting at word 10^9 costs about as much
+as starting at word 0.
+"""
+from automata import ALPHABET
+from tasks import checkpoint
+
+
+class _Completions:
+    # completions(r)[s] is the number of words of length r that lead from
+    # state s to a final state; levels are computed on demand and kept
+
+    def __init__(self, dfa):
+        self.table = dfa.table
+        self.levels = [[int(final) for final in dfa.accepting]]
+
+    def __call__(self, remaining):
+        levels = self.levels
+        table = self.table
+        while len(levels) <= remaining:
+            if not len(levels) % 64:
+                checkpoint()
+            previous = levels[-1]
+            levels.append([previous[table[2 * state]] + previous[table[2 * state + 1]]
+                           for state in range(len(previous))])
+        return levels[remaining]
+
+
+def _live_states(dfa):
+    # States from which some final state can be reached
+    predecessors = [[] for _ in range(dfa.num_states)]
+    for state in range(dfa.num_states):
+        for column in (0, 1):
+            predecessors[dfa.table[2 * state + column]].append(state)
+    live = [state for state in range(dfa.num_states) if dfa.accepting[state]]
+    seen = set(live)
+    for state in live:
+        for source in predecessors[state]:
+            if source not in seen:
+                seen.add(source)
+                live.append(source)
+    return seen
+
+
+def iter_shortlex(dfa, offset=0, limit=None, max_length=None):
+    """Yield the words dfa accepts in shortlex order.
+
+    The first ``offset`` words are skipped without being generated, at most
+    ``limit`` words are yielded and none longer than ``max_length``; so
+    worker i of k can take offset=i * size, limit=size.  Ends when the
+    language has no more words, which for an infinite language is never.
+    """
+    if limit is not None and limit <= 0:
+        return
+    table = dfa.table
+    completions = _Completions(dfa)
+    live = _live_states(dfa)
+
+    # States reachable in exactly `length` steps; once none of them is live
+    # there are no longer words
+    frontier = {dfa.start}
+    length = 0
+    produced = 0
+    while frontier & live and (max_length is None or length <= max_length):
+        in_length = completions(length)[dfa.start]
+        if offset >= in_length:
+            offset -= in_length
+        else:
+            for word in _words_of_length(table, dfa.start, length, offset, completions):
+                yield word
+                produced += 1
+                if produced == limit:
+                    return
+            offset = 0
+        frontier = {table[2 * state + column] for state in frontier for column in (0, 1)}
+        length += 1
+
+
+def _words_of_length(table, start, length, skip, completions):
+    # Words of exactly this length in lexicographic order, from the one of
+    # rank `skip`.  states[d] is the state after the first d symbols.
+    states = [start]
+    chars = []
+
+    def descend(skip):
+        # Extend the prefix to a full word, taking the branch that holds the
+        # word of rank skip among the completions of the prefix
+        for depth in range(len(chars), length):
+            state = states[depth]
+            count = completions(length - depth - 1)[table[2 * state]]
+            column = 0 if skip < count else 1
+            if column:
+                skip -= count
+            chars.append(ALPHABET[column])
+            states.append(table[2 * state + column])
+
+    descend(skip)
+    while True:
+        yield "".join(chars)
+        # The next word: the deepest 'a' that can become a 'b', followed by
+        # the smallest completion
+        depth = length - 1
+        while depth >= 0:
+            if chars[depth] == "a" and completions(length - depth - 1)[table[2 * states[depth] + 1]]:
+                break
+            depth -= 1
+        if depth < 0:
+            return
+        del chars[depth:]
+        del states[depth + 1:]
+        chars.append("b")
+        states.append(table[2 * states[depth] + 1])
+        descend(0)
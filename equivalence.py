@@ -0,0 +1,271 @@
+"""Language equivalence of automata and checks of what the strategies claim.
+
+Two DFAs are compared by minimising both (automata.minimize numbers the
+states of its result canonically, so equal languages give identical
+tables).  When the languages differ, a breadth-first search of the product
+automaton finds a shortest word that one accepts and the other rejects.
+Both steps are O(n log n) or better in the number of states for equal
+languages, which keeps automata with 10^5 states within a second or two.
+
+Run as a script, it checks each strategy against an independent definition
+of the language it is listed under, that its text reads back as the
+same language and that its matchers agree with its expression on short
+words, plus the equivalences the strategies state in their
+descriptions, and exits with status 1 when one fails:
+
+    python equivalence.py
+    python equivalence.py --patterns a ab aba --sizes 0 1 5 --strict
+"""
+import argparse
+import itertools
+import operator
+import sys
+from array import array
+
+from automata import ALPHABET, DFA, complement, compile_expression, minimize, product
+from derivatives import LazyDFA
+from model import RegexModel, RegexStrategy
+from notation import parse_expression
+from regex_ast import ANY_STRING, ANY_SYMBOL, concat, power, star, symbols, word
+
+
+def distinguishing_word(left, right):
+    """Return a shortest word accepted by exactly one of two DFAs, or None
+    when they accept the same language"""
+    left = minimize(left)
+    right = minimize(right)
+    if left.table == right.table and left.accepting == right.accepting:
+        return None
+
+    # Pair (p, q) is numbered p * width + q; parents lead back to (0, 0)
+    width = right.num_states
+    left_table, right_table = left.table, right.table
+    parent = {0: None}
+    queue = [0]
+    for pair in queue:
+        p, q = divmod(pair, width)
+        if left.accepting[p] != right.accepting[q]:
+            chars = []
+            while parent[pair] is not None:
+                pair, char = parent[pair]
+                chars.append(char)
+            return "".join(reversed(chars))
+        for column, char in enumerate(ALPHABET):
+            target = left_table[2 * p + column] * width + right_table[2 * q + column]
+            if target not in parent:
+                parent[target] = (pair, char)
+                queue.append(target)
+    return None
+
+
+def equivalent(left, right):
+    """Return True if two DFAs accept the same language"""
+    return distinguishing_word(left, right) is None
+
+
+def compare_expressions(left, right):
+    """distinguishing_word() for two regex_ast expressions"""
+    return distinguishing_word(compile_expression(left), compile_expression(right))
+
+
+# Reference languages, built from the definitions rather than the strategies
+
+def _starts(pattern):
+    return compile_expression(concat(word(pattern), ANY_STRING))
+
+
+def _ends(pattern):
+    return compile_expression(concat(ANY_STRING, word(pattern)))
+
+
+def _contains(pattern):
+    return compile_expression(concat(ANY_STRING, word(pattern), ANY_STRING))
+
+
+def _intersection(*dfas):
+    result = dfas[0]
+    for dfa in dfas[1:]:
+        result = product(result, dfa, operator.and_)
+    return result
+
+
+def _at_least(N):
+    return compile_expression(concat(power(ANY_SYMBOL, max(N, 0)), ANY_STRING))
+
+
+def _exactly(N):
+    return compile_expression(power(ANY_SYMBOL, N))
+
+
+def _nth_symbol(pattern, N):
+    return compile_expression(concat(power(ANY_SYMBOL, N - 1), word(pattern), ANY_STRING))
+
+
+def _nth_from_last(pattern, N):
+    return compile_expression(concat(ANY_STRING, word(pattern), power(ANY_SYMBOL, N - 1)))
+
+
+def _arguments(index, patterns, sizes):
+    if index <= 7:
+        return [(pattern,) for pattern in patterns]
+    if index <= 12:
+        return [(N,) for N in sizes]
+    if index == 13:
+        return [(pattern, N) for pattern in patterns for N in sizes if N > 0]
+    # The Nth symbol is a single symbol
+    return [(pattern, N) for pattern in patterns if len(pattern) == 1 for N in sizes if N > 0]
+
+
+# The language each strategy index is listed under, as a reference DFA
+REFERENCES = {
+    0: lambda P: _starts(P),
+    1: lambda P: _ends(P),
+    2: lambda P: _intersection(_starts(P), _ends(P)),
+    3: lambda P: _contains(P),
+    4: lambda P: complement(_contains(P)),
+    5: lambda P: _intersection(_contains(P), _starts(P)),
+    6: lambda P: _intersection(_contains(P), _ends(P)),
+    7: lambda P: _intersection(_contains(P), _starts(P), _ends(P)),
+    8: lambda N: _at_least(N + 1),
+    9: lambda N: complement(_at_least(N)),
+    10: lambda N: _at_least(N),
+    11: lambda N: complement(_at_least(N + 1)),
+    12: lambda N: _exactly(N),
+    14: lambda P, N: _nth_symbol(P, N),
+    15: lambda P, N: _nth_from_last(P, N),
+}
+
+# Claims that are known not to hold yet; reported, but only --strict fails on them
+KNOWN_FAILURES = {
+    # P•(a+b)*•P misses words where the two copies of P overlap, e.g. P itself
+    (2, "matches its definition"),
+    # Requires P[0]•...•P•...•P[-1], so it misses P itself and checks only
+    # the first and last symbols
+    (7, "matches its definition"),
+}
+
+
+def _described_claims(patterns):
+    # Equivalences stated in strategy descriptions and comments
+    a, b = symbols("ab")
+    yield ("4 ab", "does not contain 'ab' = b*a*",
+           lambda: _strategy_dfa(4, "ab"), lambda: compile_expression(concat(star(b), star(a))))
+    yield ("4 ba", "does not contain 'ba' = a*b*",
+           lambda: _strategy_dfa(4, "ba"), lambda: compile_expression(concat(star(a), star(b))))
+    for P in patterns:
+        yield (f"5 {P}", "starting with P implies containing P",
+               lambda P=P: _intersection(_starts(P), _contains(P)), lambda P=P: _starts(P))
+        yield (f"6 {P}", "ending with P implies containing P",
+               lambda P=P: _intersection(_ends(P), _contains(P)), lambda P=P: _ends(P))
+
+
+def _strategy_dfa(index, *args):
+    return RegexModel.strategy_classes[index]().build_automaton(*args)
+
+
+def _expression_dfa(index, *args):
+    return compile_expression(RegexModel.strategy_classes[index]().build_expression(*args))
+
+
+# Matchers are compared with the expression on every word up to this length
+MATCHER_LENGTH = 8
+
+
+def _matcher_dfa(matcher, max_length=MATCHER_LENGTH):
+    # The words of at most max_length symbols that matcher accepts, as a
+    # DFA shaped like the binary tree of those words in shortlex order (the
+    # children of word i are 2i+1 and 2i+2); longer words reach a sink
+    words = [""]
+    for text in words:
+        if len(text) < max_length:
+            words.extend(text + char for char in ALPHABET)
+    sink = len(words)
+    table = array("l")
+    for position, text in enumerate(words):
+        if len(text) < max_length:
+            table.extend((2 * position + 1, 2 * position + 2))
+        else:
+            table.extend((sink, sink))
+    table.extend((sink, sink))
+    return DFA(table, bytearray(matcher.match_many(words)) + b"\0")
+
+
+def _bounded_expression_dfa(index, *args, max_length=MATCHER_LENGTH):
+    return _intersection(_expression_dfa(index, *args), complement(_at_least(max_length + 1)))
+
+
+def _parsed_dfa(index, *args):
+    return compile_expression(parse_expression(RegexModel.strategy_classes[index]().generate_regex(*args)))
+
+
+def claims(patterns, sizes, strategies=None):
+    """Yield (label, claim, left builder, right builder) for every check.
+
+    The left side is the strategy's language.  Each strategy is checked
+    against the language it is listed under, its generated text, read back
+    by notation.parse_expression, against its expression and, where it
+    builds its automaton separately, its expression against that automaton.
+    Its build_matcher(), if it has one, and a LazyDFA with room for only a
+    few states are checked against the expression on all words of up to
+    MATCHER_LENGTH symbols.
+    """
+    strategies = sorted(RegexModel.strategy_classes) if strategies is None else strategies
+    for index in strategies:
+        own_automaton = RegexModel.strategy_classes[index].build_automaton is not RegexStrategy.build_automaton
+        for args in _arguments(index, patterns, sizes):
+            label = f"{index} {' '.join(map(str, args))}"
+            if index in REFERENCES:
+                yield (label, "matches its definition",
+                       lambda index=index, args=args: _strategy_dfa(index, *args),
+                       lambda index=index, args=args: REFERENCES[index](*args))
+            yield (label, "text parses back to its expression",
+                   lambda index=index, args=args: _parsed_dfa(index, *args),
+                   lambda index=index, args=args: _expression_dfa(index, *args))
+            if hasattr(RegexModel.strategy_classes[index], "build_matcher"):
+                yield (label, "matcher agrees with its expression",
+                       lambda index=index, args=args: _matcher_dfa(
+                           RegexModel.strategy_classes[index]().build_matcher(*args)),
+                       lambda index=index, args=args: _bounded_expression_dfa(index, *args))
+            yield (label, "lazy DFA agrees with its expression",
+                   lambda index=index, args=args: _matcher_dfa(
+                       LazyDFA(RegexModel.strategy_classes[index]().build_expression(*args), max_states=4)),
+                   lambda index=index, args=args: _bounded_expression_dfa(index, *args))
+            if own_automaton:
+                yield (label, "expression matches automaton",
+                       lambda index=index, args=args: _expression_dfa(index, *args),
+                       lambda index=index, args=args: _strategy_dfa(index, *args))
+    yield from _described_claims(patterns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patterns", nargs="+",
+                        default=["".join(chars) for length in (1, 2, 3) for chars in itertools.product("ab", repeat=length)]
+                        + ["abab", "abba", "aabaa"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1, 2, 3, 5, 8])
+    parser.add_argument("--strategies", type=int, nargs="+")
+    parser.add_argument("--strict", action="store_true", help="fail on known failures too")
+    parser.add_argument("--verbose", "-v", action="store_true", help="print passing claims too")
+    args = parser.parse_args(argv)
+
+    checked = failed = known = 0
+    for label, claim, left, right in claims(args.patterns, args.sizes, args.strategies):
+        checked += 1
+        left_dfa, right_dfa = left(), right()
+        witness = distinguishing_word(left_dfa, right_dfa)
+        if witness is None:
+            if args.verbose:
+                print(f"ok    {label}: {claim}")
+            continue
+        side = "left" if left_dfa.matches(witness) else "right"
+        is_known = (int(label.split()[0]), claim) in KNOWN_FAILURES
+        known += is_known
+        failed += not is_known
+        print(f"{'known' if is_known else 'FAIL':<5} {label}: {claim}: '{witness}' is accepted by the "
+              f"{side} side only")
+    print(f"{checked} claims checked, {failed} failed, {known} known failures")
+    return 1 if failed or (args.strict and known) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
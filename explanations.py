@@ -0,0 +1,123 @@
+"""HTML shown in the "How It Works" panel, one entry per pattern index.
+
+Kept out of model.py so headless use never has to load it.
+"""
+
+EXPLANATIONS = [
+    # 0: Starts with P
+    """
+    <h3>Starts With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w starts with P}</b></p>
+    <p><b>Regular Expression:</b> P(a+b)*</p>
+    """,
+    # 1: Ends with P
+    """
+    <h3>Ends With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w ends with P}</b></p>
+    <p><b>Regular Expression:</b> (a+b)*P</p>
+    """,
+    # 2: Starts and ends with P
+    """
+    <h3>Starts and Ends With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w starts and ends with P}</b></p>
+    <p><b>Regular Expression:</b> P(a+b)*P or P(middle)* for overlapping patterns</p>
+    """,
+    # 3: Contains P
+    """
+    <h3>Contains Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w contains P}</b></p>
+    <p><b>Regular Expression:</b> (a+b)*P(a+b)*</p>
+    """,
+    # 4: Does not contain P
+    """
+    <h3>Does Not Contain Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w does not contain P}</b></p>
+    <p><b>Method:</b> build the KMP automaton that finds P, make every state before
+    the match accepting (the complement), then remove states one by one until
+    a single regular expression is left.</p>
+    """,
+    # 5: Contains P and starts with P
+    """
+    <h3>Contains and Starts With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w contains P and starts with P}</b></p>
+    <p><b>Regular Expression:</b> P(a+b)* (since starting with P implies containing P)</p>
+    """,
+    # 6: Contains P and ends with P
+    """
+    <h3>Contains and Ends With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w contains P and ends with P}</b></p>
+    <p><b>Regular Expression:</b> (a+b)*P (since ending with P implies containing P)</p>
+    """,
+    # 7: Contains P and starts with P and ends with P
+    """
+    <h3>Contains, Starts With, and Ends With Pattern</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | w contains P and starts with P and ends with P}</b></p>
+    <p><b>Regular Expression:</b> P(a+b)*P or P(middle)* for overlapping patterns</p>
+    """,
+    # 8: |w| > N
+    """
+    <h3>Length Greater Than N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | |w| > N}</b></p>
+    <p><b>Regular Expression:</b> (a+b)^(N+1)(a+b)*</p>
+    """,
+    # 9: |w| < N
+    """
+    <h3>Length Less Than N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | |w| < N}</b></p>
+    <p><b>Regular Expression:</b> ε + (a+b) + (a+b)^2 + ... + (a+b)^(N-1)</p>
+    """,
+    # 10: |w| >= N
+    """
+    <h3>Length Greater Than or Equal To N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | |w| >= N}</b></p>
+    <p><b>Regular Expression:</b> (a+b)^N(a+b)*</p>
+    """,
+    # 11: |w| <= N
+    """
+    <h3>Length Less Than or Equal To N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | |w| <= N}</b></p>
+    <p><b>Regular Expression:</b> ε + (a+b) + (a+b)^2 + ... + (a+b)^N</p>
+    """,
+    # 12: |w| = N
+    """
+    <h3>Length Equal To N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | |w| = N}</b></p>
+    <p><b>Regular Expression:</b> (a+b)^N</p>
+    """,
+    # 13: # of P in w is divisible by N
+    """
+    <h3>Count of P Divisible By N</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | # of P in w is divisible by N}</b></p>
+    <p><b>Method:</b> the KMP automaton for P splits every word at its occurrences of P
+    as S L...L Z; the count is divisible by N when there are none, or N, 2N, ... of them:</p>
+    <p><b>Regular Expression:</b> Z<sub>0</sub> + S L^(N-1) (L^N)* Z</p>
+    """,
+    # 14: Nth symbol is P
+    """
+    <h3>Nth Symbol Is P</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | the Nth symbol of w is P}</b></p>
+    <p><b>Regular Expression:</b> (a+b)^(N-1)P(a+b)*</p>
+    """,
+    # 15: Nth symbol from last is P
+    """
+    <h3>Nth Symbol From Last Is P</h3>
+    <p>This tool generates a regular expression for the language:</p>
+    <p><b>L = {w ∈ {a,b}* | the Nth symbol from the last is P}</b></p>
+    <p><b>Regular Expression:</b> (a+b)*P(a+b)^(N-1)</p>
+    """
+]
@@ -2,18 +2,22 @@ import os
 import sys
 from pathlib import Path
 
-from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication
-from controller import RegexController
-from view import RegexView
 from model import RegexModel
+from store import default_path
 
 
 def main():
+    # Qt and the GUI modules are only imported when the window is actually
+    # opened, so `import main` / `import model` stay cheap for headless use
+    from PyQt5.QtGui import QIcon
+    from PyQt5.QtWidgets import QApplication
+    from controller import RegexController
+    from view import RegexView
+
     app = QApplication(sys.argv)
 
     # Create MVC components
-    model = RegexModel()
+    model = RegexModel(store_path=default_path())
     view = RegexView()
     controller = RegexController(model, view)
 
@@ -1,218 +1,286 @@
 from abc import ABC, abstractmethod
-import re
+from functools import lru_cache
+
+from cache import CachedStrategy, GenerationCache
+from counters import counter_automaton
+from automata import (avoiding_automaton, compile_expression, counting_automaton, occurrence_paths,
+                      to_expression)
+from regex_ast import (ANY_STRING, ANY_SYMBOL, EMPTY, EPSILON, Concat, Power, Symbol, Union,
+                       concat, iter_chunks, iter_compact, iter_formal, power, star, symbols, union,
+                       word)
+from shift_and import ends_with_matcher
+from simplify import simplify as simplify_expression
+from tasks import checked
+
+# Longest pattern, in symbols over all patterns, that live preview regenerates
+# for strategies built by state elimination, which is not incremental in P;
+# up to here a keystroke fits a 60 Hz frame (benchmarks/bench_live_preview.py)
+PREVIEW_MAX_PATTERN = 64
 
 
 class RegexStrategy(ABC):
     """Abstract base class for regex generation strategies"""
 
+    # Keyword arguments for regex_ast.render_formal, or None to render in the
+    # textbook notation used by P(a+b)*
+    formal_notation = None
+
+    # Total pattern length above which live preview waits for Generate, or
+    # None for no limit
+    preview_max_pattern = None
+
+    # Strategies whose DFA can be very large also define build_matcher(*args),
+    # returning an object with matches() and match_many() that membership
+    # tests use instead
+
     @abstractmethod
-    def generate_regex(self, *args):
+    def build_expression(self, *args):
+        """Return the regular expression as a regex_ast node"""
         pass
 
     @abstractmethod
     def get_description(self, *args):
         pass
 
+    def generate_regex(self, *args, **options):
+        return "".join(self.iter_tokens(*args, **options))
+
+    def iter_regex(self, *args, chunk_size=64 * 1024, **options):
+        """Yield the expression generate_regex() returns in pieces of about
+        chunk_size characters, without building the whole string"""
+        return iter_chunks(self.iter_tokens(*args, **options), chunk_size)
+
+    def write_regex(self, target, *args, chunk_size=64 * 1024, **options):
+        """Write the expression to a text file object chunk by chunk and
+        return the number of characters written"""
+        written = 0
+        for chunk in self.iter_regex(*args, chunk_size=chunk_size, **options):
+            target.write(chunk)
+            written += len(chunk)
+        return written
+
+    def iter_tokens(self, *args, simplify=False, **options):
+        # simplify=True shrinks the expression first and writes the result in
+        # the compact notation, which keeps powers folded and adds no
+        # parentheses of its own
+        node = self.build_expression(*args, **options)
+        if simplify:
+            return checked(iter_compact(simplify_expression(node)))
+        return self.render_tokens(node)
+
+    def build_automaton(self, *args):
+        """Return a DFA for the language, by default compiled from the expression"""
+        return compile_expression(self.build_expression(*args))
+
+    def render_tokens(self, node):
+        # Rendering large expressions can take a while; checked() lets a
+        # GUI task cancel it between tokens
+        if self.formal_notation is None:
+            return checked(iter_compact(node))
+        return checked(iter_formal(node, **self.formal_notation))
+
+    def render(self, node):
+        return "".join(self.render_tokens(node))
+
 
 class StartsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        return f"{pattern}(a+b)*"
+    def build_expression(self, pattern):
+        return concat(word(pattern), ANY_STRING)
 
     def get_description(self, pattern):
         return f"starts with '{pattern}'"
 
 
 class EndsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        return f"(a+b)*{pattern}"
+    def build_expression(self, pattern):
+        return concat(ANY_STRING, word(pattern))
+
+    def build_matcher(self, pattern):
+        # Only the last |P| symbols need reading
+        return ends_with_matcher(pattern)
 
     def get_description(self, pattern):
         return f"ends with '{pattern}'"
 
 
 class StartsAndEndsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        return f"{pattern}(a+b)*{pattern}"
+    def build_expression(self, pattern):
+        return concat(word(pattern), ANY_STRING, word(pattern))
 
     def get_description(self, pattern):
         return f"starts and ends with '{pattern}'"
 
 
 class ContainsStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        return f"(a+b)*{pattern}(a+b)*"
+    def build_expression(self, pattern):
+        return concat(ANY_STRING, word(pattern), ANY_STRING)
 
     def get_description(self, pattern):
         return f"contains '{pattern}'"
 
 
-class DoesNotContainStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        # For simple patterns, we can construct a proper regular expression
-        # For complex patterns, this becomes much more difficult
-
-        if len(pattern) == 1:
-            # For single character patterns like "a" or "b"
-            other_char = 'b' if pattern == 'a' else 'a'
-            return f"({other_char})*"
+@lru_cache(maxsize=256)
+def _avoiding_expression(pattern):
+    # The KMP automaton for P with its match state made a rejecting sink
+    # accepts exactly the words without P; state elimination turns it into
+    # an expression
+    return to_expression(avoiding_automaton(pattern))
 
-        elif pattern == "aa":
-            # Strings with no consecutive a's: b*(ab*)*
-            return f"((b)* • ((a) • (b)*))*"
 
-        elif pattern == "bb":
-            # Strings with no consecutive b's: a*(ba*)*
-            return f"((a)* • ((b) • (a)*))*"
+class DoesNotContainStrategy(RegexStrategy):
+    formal_notation = {"concat_sep": " • "}
+    preview_max_pattern = PREVIEW_MAX_PATTERN
 
-        elif pattern == "ab":
-            # Strings that don't contain "ab"
-            # This would be strings of all a's followed by all b's, but not mixed
-            return f"(a)* + (b)*"
+    def build_expression(self, pattern):
+        if not pattern:
+            return EMPTY  # Every string contains the empty pattern
+        return _avoiding_expression(pattern)
 
-        elif pattern == "ba":
-            # Strings that don't contain "ba"
-            # This would be strings of all b's followed by all a's, but not mixed
-            return f"(b)* + (a)*"
-
-        else:
-            # For more complex patterns, we cannot easily express "does not contain P"
-            # as a simple regular expression using the basic operations
-            # This would typically require complementation, which is not a primitive operation
-            # in the definition of regular expressions
-            raise ValueError(f"Cannot generate a regular expression for 'does not contain {pattern}' " +
-                             "using only the basic operations (•, +, *)")
+    def build_automaton(self, pattern):
+        if not pattern:
+            return super().build_automaton(pattern)
+        return avoiding_automaton(pattern)
 
     def get_description(self, pattern):
-        if len(pattern) == 1:
-            return f"does not contain '{pattern}'"
-        elif pattern == "aa":
+        if pattern == "aa":
             return "does not contain 'aa' (no consecutive a's)"
         elif pattern == "bb":
             return "does not contain 'bb' (no consecutive b's)"
         elif pattern == "ab":
-            return "does not contain 'ab' (all a's followed by all b's, or only a's, or only b's)"
+            return "does not contain 'ab' (all b's followed by all a's, or only a's, or only b's)"
         elif pattern == "ba":
-            return "does not contain 'ba' (all b's followed by all a's, or only a's, or only b's)"
+            return "does not contain 'ba' (all a's followed by all b's, or only a's, or only b's)"
         else:
-            return f"does not contain '{pattern}' (complex pattern - no simple regex available)"
+            return f"does not contain '{pattern}'"
+
+
+class _CountedStrategy(RegexStrategy):
+    # Languages written with (a+b)^{N}: the DFA grows with N, while the
+    # counting automaton has a few states whatever N is
+    def build_matcher(self, *args):
+        return counter_automaton(self.build_expression(*args))
 
 
-class LengthGreaterThanStrategy(RegexStrategy):
-    def generate_regex(self, N):
-        return f"(a+b)^{{{N + 1}}}(a+b)*"
+class LengthGreaterThanStrategy(_CountedStrategy):
+    def build_expression(self, N):
+        return Concat(Power(ANY_SYMBOL, N + 1), ANY_STRING)
 
     def get_description(self, N):
         return f"has length greater than {N}"
 
 
-class LengthLessThanStrategy(RegexStrategy):
-    def generate_regex(self, N):
+def _lengths_up_to(max_length, compact=False):
+    """Expression for every string of length 0 through max_length.
+
+    The expanded form is a union with one term per length, which renders
+    to O(max_length²) characters.  The compact form nests the terms instead,
+    ε+(a+b)•(ε+(a+b)•(...)), and renders to O(max_length) characters.
+    Either way the tree itself has O(max_length) nodes.
+    """
+    if max_length == 0:
+        return EPSILON
+
+    if compact:
+        # Innermost term covers lengths 0..1, each wrapper adds one more
+        node = Union(EPSILON, ANY_SYMBOL)
+        for _ in range(1, max_length):
+            node = Union(EPSILON, Concat(ANY_SYMBOL, node))
+        return node
+
+    # Union of ε and (a+b) concatenated i times for each length i
+    parts = [EPSILON, ANY_SYMBOL]
+    parts.extend(Power(ANY_SYMBOL, i) for i in range(2, max_length + 1))
+    return Union(*parts)
+
+
+class _LengthUpToStrategy(_CountedStrategy):
+    # Powers are spelled out as (a+b)•(a+b)•... in the expanded form
+    formal_notation = {"wrap_alternatives": True, "expand_powers": True}
+
+    def iter_tokens(self, N, compact=False, simplify=False):
+        node = self.build_expression(N, compact)
+        if simplify:
+            return checked(iter_compact(simplify_expression(node)))
+        if compact:
+            return checked(iter_formal(node, union_sep="+"))
+        return self.render_tokens(node)
+
+
+class LengthLessThanStrategy(_LengthUpToStrategy):
+    def build_expression(self, N, compact=False):
         if N <= 0:
-            return "∅"  # No strings have length less than 0
+            return EMPTY  # No strings have length less than 0
 
         # Create union of all lengths from 0 to N-1 using formal syntax
-        parts = ["ε"]  # Empty string
-
-        # For each length from 1 to N-1, create the formal expression
-        for i in range(1, N):
-            # For strings of length i: all combinations of a and b of length i
-            # This is equivalent to (a+b) concatenated i times
-
-            if i == 1:
-                part = "((a)+(b))"
-            else:
-                # Build (a+b) • (a+b) • ... • (a+b) (i times)
-                part = "((a)+(b))"
-                for _ in range(1, i):
-                    part = f"{part}•((a)+(b))"
-
-            parts.append(part)
-
-        # Join all parts with union operator +
-        if len(parts) == 1:
-            return parts[0]
-        else:
-            return " + ".join(f"({part})" for part in parts)
+        return _lengths_up_to(N - 1, compact)
 
     def get_description(self, N):
         return f"has length less than {N}"
 
 
-class LengthGreaterThanOrEqualStrategy(RegexStrategy):
-    def generate_regex(self, N):
-        return f"(a+b)^{{{N}}}(a+b)*"
+class LengthGreaterThanOrEqualStrategy(_CountedStrategy):
+    def build_expression(self, N):
+        return Concat(Power(ANY_SYMBOL, N), ANY_STRING)
 
     def get_description(self, N):
         return f"has length greater than or equal to {N}"
 
 
-class LengthLessThanOrEqualStrategy(RegexStrategy):
-    def generate_regex(self, N):
+class LengthLessThanOrEqualStrategy(_LengthUpToStrategy):
+    def build_expression(self, N, compact=False):
         if N < 0:
-            return "∅"  # No strings have length less than or equal to a negative number
+            return EMPTY  # No strings have length less than or equal to a negative number
 
         # Create union of all lengths from 0 to N using formal syntax
-        parts = ["ε"]  # Empty string
-
-        # For each length from 1 to N, create the formal expression
-        for i in range(1, N + 1):
-            # For strings of length i: all combinations of a and b of length i
-            # This is equivalent to (a+b) concatenated i times
-
-            if i == 1:
-                part = "((a)+(b))"
-            else:
-                # Build (a+b) • (a+b) • ... • (a+b) (i times)
-                part = "((a)+(b))"
-                for _ in range(1, i):
-                    part = f"{part}•((a)+(b))"
-
-            parts.append(part)
-
-        # Join all parts with union operator +
-        if len(parts) == 1:
-            return parts[0]
-        else:
-            return " + ".join(f"({part})" for part in parts)
+        return _lengths_up_to(N, compact)
 
     def get_description(self, N):
         return f"has length less than or equal to {N}"
 
 
-class LengthEqualStrategy(RegexStrategy):
-    def generate_regex(self, N):
-        return f"(a+b)^{{{N}}}"
+class LengthEqualStrategy(_CountedStrategy):
+    def build_expression(self, N):
+        return Power(ANY_SYMBOL, N)
 
     def get_description(self, N):
         return f"has length exactly {N}"
 
 
+@lru_cache(maxsize=256)
+def _occurrence_paths(pattern):
+    return occurrence_paths(pattern)
+
+
 class CountDivisibleByStrategy(RegexStrategy):
-    def generate_regex(self, pattern, N):
+    """Number of (possibly overlapping) occurrences of P divisible by N.
+
+    The expression is Z0 + S•L^{N-1}•(L^{N})*•Zm, built from the four path
+    expressions of automata.occurrence_paths.  Those depend on P only, so
+    the expression has the same size for every N; spelled out without the
+    ^{N} notation it grows linearly in N.  build_automaton() gives the
+    (|P|+1)•N state DFA directly for membership tests.
+    """
+    formal_notation = {}
+    preview_max_pattern = PREVIEW_MAX_PATTERN
+
+    def build_expression(self, pattern, N):
         if N <= 0:
-            return "∅"  # Divisible by 0 or negative numbers is undefined
-
-        # For the general case, generating a regular expression for
-        # "number of occurrences of P is divisible by N" is complex
-        # and requires building a finite automaton with N states
+            return EMPTY  # Divisible by 0 or negative numbers is undefined
+        if not pattern:
+            raise ValueError("Cannot count occurrences of an empty pattern")
 
-        # We can only handle very simple cases directly
-        if pattern in ["a", "b"] and N == 1:
-            # Any number of the pattern (divisible by 1)
-            other_char = "b" if pattern == "a" else "a"
-            return f"(({other_char})*•({pattern})•({other_char})*)*"
+        none, first, between, rest = _occurrence_paths(pattern)
+        if N == 1:
+            return ANY_STRING  # Every count is divisible by 1
 
-        elif pattern in ["a", "b"] and N == 2:
-            # Even number of the pattern
-            other_char = "b" if pattern == "a" else "a"
-            return f"(({other_char})*•({pattern})•({other_char})*•({pattern})•({other_char})*)*"
+        # No occurrence at all counts as 0; otherwise the occurrences split
+        # the word as S•L^{k-1}•Zm and k must be one of N, 2N, 3N, ...
+        return union(none, concat(first, power(between, N - 1), star(power(between, N)), rest))
 
-        else:
-            # For more complex cases, we cannot easily express this
-            # as a simple regular expression using basic operations
-            raise ValueError(f"Cannot generate a regular expression for 'count of {pattern} divisible by {N}' " +
-                             "using only the basic operations (•, +, *). " +
-                             "This would require building a finite automaton with {N} states.")
+    def build_automaton(self, pattern, N):
+        if not pattern:
+            raise ValueError("Cannot count occurrences of an empty pattern")
+        return counting_automaton(pattern, N)
 
     def get_description(self, pattern, N):
         if N == 1:
@@ -221,103 +289,77 @@ class CountDivisibleByStrategy(RegexStrategy):
             return f"has count of '{pattern}' divisible by {N}"
 
 
-class NthSymbolIsStrategy(RegexStrategy):
-    def generate_regex(self, pattern, N):
+class NthSymbolIsStrategy(_CountedStrategy):
+    def build_expression(self, pattern, N):
         if N == 1:
-            return f"{pattern}(a+b)*"
+            return concat(word(pattern), ANY_STRING)
         else:
-            return f"(a+b)^{{{N - 1}}}{pattern}(a+b)*"
+            return concat(Power(ANY_SYMBOL, N - 1), word(pattern), ANY_STRING)
 
     def get_description(self, pattern, N):
         return f"has the {N}th symbol as '{pattern}'"
 
 
-class NthSymbolFromLastIsStrategy(RegexStrategy):
-    def generate_regex(self, pattern, N):
+class NthSymbolFromLastIsStrategy(_CountedStrategy):
+    # The DFA needs 2^N states; the counting automaton checks P at N + |P| - 1
+    # symbols from the end
+    def build_expression(self, pattern, N):
         if N == 1:
-            return f"(a+b)*{pattern}"
+            return concat(ANY_STRING, word(pattern))
         else:
-            return f"(a+b)*{pattern}(a+b)^{{{N - 1}}}"
+            return concat(ANY_STRING, word(pattern), Power(ANY_SYMBOL, N - 1))
 
     def get_description(self, pattern, N):
         return f"has the {N}th symbol from the last as '{pattern}'"
 
 
 class ContainsAndStartsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        # Convert the pattern to proper regular expression syntax
-        if len(pattern) == 0:
-            return "∅"  # Empty pattern case
+    formal_notation = {}
 
-        # Convert each character in the pattern to the formal representation
-        pattern_expr = f"({pattern[0]})"
-        for char in pattern[1:]:
-            pattern_expr = f"{pattern_expr}•({char})"
+    def build_expression(self, pattern):
+        if len(pattern) == 0:
+            return EMPTY  # Empty pattern case
 
         # For strings that start with P and contain P
         # Since it starts with P, it automatically contains P
         # So we just need: P • (any combination of a and b)*
-
-        # Represent (a+b)* in formal syntax as ((a)+(b))*
-        any_string = "((a)+(b))*"
-
-        # Return the complete formal regular expression
-        return f"{pattern_expr}•{any_string}"
+        return Concat(*symbols(pattern), ANY_STRING)
 
     def get_description(self, pattern):
         return f"contains '{pattern}' and starts with '{pattern}' (starting with P implies containing P)"
 
 
 class ContainsAndEndsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
-        # Convert the pattern to proper regular expression syntax
-        if len(pattern) == 0:
-            return "∅"  # Empty pattern case
+    formal_notation = {}
 
-        # Convert each character in the pattern to the formal representation
-        pattern_expr = f"({pattern[0]})"
-        for char in pattern[1:]:
-            pattern_expr = f"{pattern_expr}•({char})"
+    def build_expression(self, pattern):
+        if len(pattern) == 0:
+            return EMPTY  # Empty pattern case
 
         # For strings that end with P and contain P
         # Since it ends with P, it automatically contains P
         # So we just need: (any combination of a and b)* • P
-
-        # Represent (a+b)* in formal syntax as ((a)+(b))*
-        any_string = "((a)+(b))*"
-
-        # Return the complete formal regular expression
-        return f"{any_string}•{pattern_expr}"
+        return Concat(ANY_STRING, *symbols(pattern))
 
     def get_description(self, pattern):
         return f"contains '{pattern}' and ends with '{pattern}' (ending with P implies containing P)"
 
 
 class ContainsStartsAndEndsWithStrategy(RegexStrategy):
-    def generate_regex(self, pattern):
+    formal_notation = {}
+
+    def build_expression(self, pattern):
         # For strings that:
         # 1. Start with the first character of P
         # 2. End with the last character of P
         # 3. Contain the full pattern P somewhere
 
         if len(pattern) == 0:
-            return "∅"  # Empty pattern case
-
-        # Convert the full pattern to formal syntax
-        full_pattern_expr = f"({pattern[0]})"
-        for char in pattern[1:]:
-            full_pattern_expr = f"{full_pattern_expr}•({char})"
-
-        # Get the first and last characters
-        start_char = pattern[0]
-        end_char = pattern[-1]
-
-        # Represent (a+b)* in formal syntax as ((a)+(b))*
-        any_string = "((a)+(b))*"
+            return EMPTY  # Empty pattern case
 
         # The regular expression is:
         # start_char • (any_string) • full_pattern • (any_string) • end_char
-        return f"({start_char})•{any_string}•{full_pattern_expr}•{any_string}•({end_char})"
+        return Concat(Symbol(pattern[0]), ANY_STRING, *symbols(pattern), ANY_STRING, Symbol(pattern[-1]))
 
     def get_description(self, pattern):
         if len(pattern) == 0:
@@ -328,26 +370,43 @@ class ContainsStartsAndEndsWithStrategy(RegexStrategy):
             return f"contains '{pattern}', starts with '{pattern[0]}', and ends with '{pattern[-1]}'"
 
 
+# Part of every persistent cache key; bump it whenever a strategy's output changes
+MODEL_VERSION = "4"
+
+
 class RegexModel:
-    def __init__(self):
-        self.strategies = {
-            0: StartsWithStrategy(),
-            1: EndsWithStrategy(),
-            2: StartsAndEndsWithStrategy(),
-            3: ContainsStrategy(),
-            4: DoesNotContainStrategy(),
-            5: ContainsAndStartsWithStrategy(),
-            6: ContainsAndEndsWithStrategy(),
-            7: ContainsStartsAndEndsWithStrategy(),
-            8: LengthGreaterThanStrategy(),
-            9: LengthLessThanStrategy(),
-            10: LengthGreaterThanOrEqualStrategy(),
-            11: LengthLessThanOrEqualStrategy(),
-            12: LengthEqualStrategy(),
-            13: CountDivisibleByStrategy(),
-            14: NthSymbolIsStrategy(),
-            15: NthSymbolFromLastIsStrategy()
-        }
+    # Strategy class for each pattern index; instances are created on first use
+    strategy_classes = {
+        0: StartsWithStrategy,
+        1: EndsWithStrategy,
+        2: StartsAndEndsWithStrategy,
+        3: ContainsStrategy,
+        4: DoesNotContainStrategy,
+        5: ContainsAndStartsWithStrategy,
+        6: ContainsAndEndsWithStrategy,
+        7: ContainsStartsAndEndsWithStrategy,
+        8: LengthGreaterThanStrategy,
+        9: LengthLessThanStrategy,
+        10: LengthGreaterThanOrEqualStrategy,
+        11: LengthLessThanOrEqualStrategy,
+        12: LengthEqualStrategy,
+        13: CountDivisibleByStrategy,
+        14: NthSymbolIsStrategy,
+        15: NthSymbolFromLastIsStrategy
+    }
+
+    def __init__(self, cache=None, store_path=None):
+        # Shared by every strategy; see cache.GenerationCache for the bounds.
+        # With store_path, results that were slow to compute are also kept
+        # on disk for later sessions.
+        if cache is None:
+            store = None
+            if store_path:
+                from store import ResultStore
+                store = ResultStore(store_path, MODEL_VERSION)
+            cache = GenerationCache(store=store)
+        self.cache = cache
+        self.strategies = {}
 
         self.patterns = [
             "L = {w ∈ {a,b}* | w starts with P}",
@@ -368,129 +427,100 @@ class RegexModel:
             "L = {w ∈ {a,b}* | the Nth symbol from the last is P}"
         ]
 
-        self.explanations = [
-            # 0: Starts with P
-            """
-            <h3>Starts With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w starts with P}</b></p>
-            <p><b>Regular Expression:</b> P(a+b)*</p>
-            """,
-            # 1: Ends with P
-            """
-            <h3>Ends With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w ends with P}</b></p>
-            <p><b>Regular Expression:</b> (a+b)*P</p>
-            """,
-            # 2: Starts and ends with P
-            """
-            <h3>Starts and Ends With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w starts and ends with P}</b></p>
-            <p><b>Regular Expression:</b> P(a+b)*P or P(middle)* for overlapping patterns</p>
-            """,
-            # 3: Contains P
-            """
-            <h3>Contains Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w contains P}</b></p>
-            <p><b>Regular Expression:</b> (a+b)*P(a+b)*</p>
-            """,
-            # 4: Does not contain P
-            """
-            <h3>Does Not Contain Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w does not contain P}</b></p>
-            <p><b>Note:</b> This is complex and may not have a simple regex for all patterns.</p>
-            """,
-            # 5: Contains P and starts with P
-            """
-            <h3>Contains and Starts With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w contains P and starts with P}</b></p>
-            <p><b>Regular Expression:</b> P(a+b)* (since starting with P implies containing P)</p>
-            """,
-            # 6: Contains P and ends with P
-            """
-            <h3>Contains and Ends With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w contains P and ends with P}</b></p>
-            <p><b>Regular Expression:</b> (a+b)*P (since ending with P implies containing P)</p>
-            """,
-            # 7: Contains P and starts with P and ends with P
-            """
-            <h3>Contains, Starts With, and Ends With Pattern</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | w contains P and starts with P and ends with P}</b></p>
-            <p><b>Regular Expression:</b> P(a+b)*P or P(middle)* for overlapping patterns</p>
-            """,
-            # 8: |w| > N
-            """
-            <h3>Length Greater Than N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | |w| > N}</b></p>
-            <p><b>Regular Expression:</b> (a+b)^(N+1)(a+b)*</p>
-            """,
-            # 9: |w| < N
-            """
-            <h3>Length Less Than N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | |w| < N}</b></p>
-            <p><b>Regular Expression:</b> ε + (a+b) + (a+b)^2 + ... + (a+b)^(N-1)</p>
-            """,
-            # 10: |w| >= N
-            """
-            <h3>Length Greater Than or Equal To N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | |w| >= N}</b></p>
-            <p><b>Regular Expression:</b> (a+b)^N(a+b)*</p>
-            """,
-            # 11: |w| <= N
-            """
-            <h3>Length Less Than or Equal To N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | |w| <= N}</b></p>
-            <p><b>Regular Expression:</b> ε + (a+b) + (a+b)^2 + ... + (a+b)^N</p>
-            """,
-            # 12: |w| = N
-            """
-            <h3>Length Equal To N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | |w| = N}</b></p>
-            <p><b>Regular Expression:</b> (a+b)^N</p>
-            """,
-            # 13: # of P in w is divisible by N
-            """
-            <h3>Count of P Divisible By N</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | # of P in w is divisible by N}</b></p>
-            <p><b>Note:</b> This requires building a finite automaton with N states.</p>
-            """,
-            # 14: Nth symbol is P
-            """
-            <h3>Nth Symbol Is P</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | the Nth symbol of w is P}</b></p>
-            <p><b>Regular Expression:</b> (a+b)^(N-1)P(a+b)*</p>
-            """,
-            # 15: Nth symbol from last is P
-            """
-            <h3>Nth Symbol From Last Is P</h3>
-            <p>This tool generates a regular expression for the language:</p>
-            <p><b>L = {w ∈ {a,b}* | the Nth symbol from the last is P}</b></p>
-            <p><b>Regular Expression:</b> (a+b)*P(a+b)^(N-1)</p>
-            """
-        ]
-
     def get_patterns(self):
         return self.patterns
 
     def get_explanation(self, index):
-        return self.explanations[index]
+        # The HTML is only needed by the GUI, so it is loaded on first use
+        from explanations import EXPLANATIONS
+        return EXPLANATIONS[index]
 
     def get_strategy(self, index):
-        return self.strategies.get(index)
+        strategy = self.strategies.get(index)
+        if strategy is None:
+            strategy_class = self.strategy_classes.get(index)
+            if strategy_class is None:
+                return None
+            strategy = self.strategies[index] = CachedStrategy(strategy_class(), self.cache)
+        return strategy
+
+    def get_composition(self):
+        """Return the strategy for compositions of clauses over several
+        patterns (see composition.py), cached like the others"""
+        strategy = self.strategies.get("composition")
+        if strategy is None:
+            from composition import CompositionStrategy
+            strategy = self.strategies["composition"] = CachedStrategy(CompositionStrategy(), self.cache)
+        return strategy
+
+    def get_multi_pattern(self, kind):
+        """Return the strategy for words containing "any", "all" or "none" of
+        several patterns, given as its arguments (see aho_corasick.py)"""
+        key = "multi-pattern " + kind
+        strategy = self.strategies.get(key)
+        if strategy is None:
+            from aho_corasick import STRATEGY_CLASSES
+            strategy = self.strategies[key] = CachedStrategy(STRATEGY_CLASSES[kind](), self.cache)
+        return strategy
+
+    def composition_clauses(self, index, p1, p2, p3="", operation="and"):
+        """Return the clauses strategies 5-7 stand for with separate patterns:
+        contains P1, starts and/or ends with P2, and optionally a clause on
+        P3 joined by operation ("and", "or" or "but not")"""
+        clauses = [("contains", p1)]
+        if index in (5, 7):
+            clauses.append(("and", "starts", p2))
+        if index in (6, 7):
+            clauses.append(("and", "ends", p2))
+        if p3:
+            clauses.append((operation, "contains", p3))
+        return tuple(clauses)
+
+    def compile(self, index, *args):
+        """Return the DFA for a strategy's language (cached like generated text)"""
+        return self.get_strategy(index).build_automaton(*args)
+
+    def cache_stats(self):
+        """Return hit, miss and eviction counters and the current cache size"""
+        return self.cache.stats()
+
+    def clear_cache(self):
+        self.cache.clear()
+
+    def resize_cache(self, max_entries=None, max_bytes=None):
+        self.cache.resize(max_entries, max_bytes)
+
+    def matches(self, index, word, *args):
+        """Return True if word is in the language of strategy index with args"""
+        return self.get_strategy(index).build_matcher(*args).matches(word)
+
+    def match_many(self, index, words, *args):
+        """Return a list of matches() results for an iterable of words"""
+        return self.get_strategy(index).build_matcher(*args).match_many(words)
+
+    def iter_members(self, index, *args, offset=0, limit=None, max_length=None):
+        """Yield the words of a strategy's language in shortlex order, from
+        word number offset, at most limit of them (see enumeration.py)"""
+        from enumeration import iter_shortlex
+        return iter_shortlex(self.compile(index, *args), offset, limit, max_length)
+
+    def count_members(self, index, length, *args, modulus=None):
+        """Return how many words of the given length a strategy's language
+        has, modulo modulus if given (see counting.py)"""
+        from counting import count_words
+        return count_words(self.compile(index, *args), length, modulus)
+
+    def get_sampler(self, index, length, *args):
+        """Return a counting.Sampler for uniformly random words of the given
+        length; reuse it, since building it is the expensive part"""
+        from counting import Sampler
+        return Sampler(self.compile(index, *args), length)
+
+    def get_lazy_matcher(self, index, *args, max_states=None):
+        """Return a derivatives.LazyDFA for a strategy's expression, which
+        builds only the states the words it reads reach"""
+        from derivatives import LAZY_MAX_STATES, LazyDFA
+        return LazyDFA(self.get_strategy(index).build_expression(*args), max_states or LAZY_MAX_STATES)
 
     def validate_pattern(self, text):
         """Validate that text contains only a and b characters"""
@@ -0,0 +1,101 @@
+"""Parser for the notation the strategies write their expressions in.
+
+Both renderers of regex_ast are understood, and any mix of them:
+
+    a, b            symbols, optionally in parentheses: (a)
+    ε, ∅            the empty word and the empty language
+    xy, x•y         concatenation, with or without the dot
+    x+y             union, binding weaker than concatenation
+    x*, x^{N}       star and power, binding tightest
+    ( ... )         grouping
+
+Spaces are ignored.  parse_expression() returns the regex_ast tree with
+the structure the text spells out: parentheses group but add no node, and
+no identity is applied, so rendering the result in the notation it was
+written in gives back the same text.
+
+The text is read once, left to right, with one frame per open parenthesis
+on an explicit stack, so parsing is linear in the length of the text and
+nesting depth is only limited by memory.
+"""
+import re
+
+from regex_ast import EMPTY, EPSILON, Concat, Power, Star, Symbol, Union
+from tasks import checkpoint
+
+# One token per match, after any spaces: a run of symbols, a symbol in
+# parentheses as the formal notation writes them, a one-character operator,
+# a power, or anything else, which is an error.  Trailing spaces match as an
+# empty token.
+_TOKENS = re.compile(r"\s*(?:([ab]+)|\(([ab])\)|([()*+•ε∅])|\^\{ *([0-9]+) *\}|(.)|$)", re.DOTALL)
+
+_SYMBOLS = {char: Symbol(char) for char in "ab"}
+
+
+def _alternative(factors):
+    return factors[0] if len(factors) == 1 else Concat(*factors)
+
+
+def _group(alternatives, factors):
+    alternatives.append(_alternative(factors))
+    return alternatives[0] if len(alternatives) == 1 else Union(*alternatives)
+
+
+def parse_expression(text):
+    """Return the regex_ast node for an expression in the strategies'
+    notation.  Raises ValueError, with the position, on malformed text."""
+    # The alternatives read so far at the current depth, the factors of
+    # the alternative being read, and one saved pair per open parenthesis
+    alternatives = []
+    factors = []
+    frames = []
+    # True where an operand must come next: at the start, after "(", "+"
+    # and "•"
+    expecting = True
+    for count, match in enumerate(_TOKENS.finditer(text)):
+        if not (count + 1) % 65536:
+            checkpoint()
+        kind = match.lastindex
+        if kind == 3:
+            char = match.group(3)
+            if char == "(":
+                frames.append((alternatives, factors, match.start(3)))
+                alternatives, factors = [], []
+                expecting = True
+            elif char == "ε" or char == "∅":
+                factors.append(EPSILON if char == "ε" else EMPTY)
+                expecting = False
+            elif expecting:
+                raise ValueError(f"Expected an expression before '{char}' at position {match.start(3)}")
+            elif char == ")":
+                if not frames:
+                    raise ValueError(f"Unmatched ')' at position {match.start(3)}")
+                node = _group(alternatives, factors)
+                alternatives, factors, _ = frames.pop()
+                factors.append(node)
+            elif char == "*":
+                factors[-1] = Star(factors[-1])
+            elif char == "+":
+                alternatives.append(_alternative(factors))
+                factors = []
+                expecting = True
+            else:
+                expecting = True  # "•" only separates factors
+        elif kind == 2:
+            factors.append(_SYMBOLS[match.group(2)])
+            expecting = False
+        elif kind == 1:
+            factors.extend(map(_SYMBOLS.__getitem__, match.group(1)))
+            expecting = False
+        elif kind == 4:
+            if expecting:
+                raise ValueError(f"Expected an expression before '^' at position {text.index('^', match.start())}")
+            factors[-1] = Power(factors[-1], int(match.group(4)))
+        elif kind == 5:
+            raise ValueError(f"Unexpected character '{match.group(5)}' at position {match.start(5)}")
+    if expecting:
+        raise ValueError("Expected an expression at the end of the text" if text.strip()
+                         else "The expression is empty")
+    if frames:
+        raise ValueError(f"Unclosed '(' at position {frames[-1][2]}")
+    return _group(alternatives, factors)
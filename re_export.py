@@ -0,0 +1,148 @@
+"""Translation of strategy languages into Python ``re`` patterns that cannot
+backtrack catastrophically.
+
+A backtracking engine takes exponential time on a failing input only when
+the pattern is ambiguous, i.e. some word can be matched in more than one
+way.  The exporter therefore emits an unambiguous pattern:
+
+* If the strategy's own expression is unambiguous by a syntactic check
+  (disjoint alternatives, at most one variable-length factor per
+  concatenation, fixed-length stars and powers), it is transcribed as is,
+  which keeps counted repetitions like (a+b)^{N} short.
+* Otherwise the language's minimal DFA is turned back into an expression by
+  state elimination.  Each word follows exactly one path through a DFA, so
+  that expression is unambiguous whatever the original looked like.
+
+Either way the pattern is anchored with \\A and \\Z, and a failing match
+explores each way of reading a prefix at most once, which keeps matching
+linear in the length of the input.
+"""
+import re
+
+from automata import compile_expression, minimize, to_expression
+from regex_ast import Concat, Empty, Epsilon, Power, Star, Symbol, Union, render_python
+
+# Python's re parser recurses once per nested group
+MAX_NESTING = 300
+
+
+def is_unambiguous(root):
+    """Return True if root passes the syntactic unambiguity check.
+
+    False means the check could not show it, not that root is ambiguous.
+    """
+    # For each node: (unambiguous, fixed length or None, first symbols)
+    facts = {}
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if node in facts:
+            stack.pop()
+            continue
+        pending = [child for child in node.children() if child not in facts]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        facts[node] = _facts(node, facts)
+    return facts[root][0]
+
+
+def _facts(node, facts):
+    cls = node.__class__
+    if cls is Symbol:
+        return True, 1, frozenset(node.char)
+    if cls is Epsilon or cls is Empty:
+        return True, 0, frozenset()
+
+    children = [facts[child] for child in node.children()]
+    ok = all(child[0] for child in children)
+    if cls is Concat:
+        lengths = [child[1] for child in children]
+        # Once every factor but one has a fixed length, the position of each
+        # factor in a word is determined
+        ok = ok and sum(length is None for length in lengths) <= 1
+        length = None if None in lengths else sum(lengths)
+        first = set()
+        for item, child in zip(node.items, children):
+            first |= child[2]
+            if not item.nullable:
+                break
+        return ok, length, frozenset(first)
+    if cls is Union:
+        lengths = [child[1] for child in children]
+        distinct_lengths = None not in lengths and len(set(lengths)) == len(lengths)
+        # Otherwise: no two alternatives share a first symbol, and at most
+        # one of them matches the empty word
+        seen = set()
+        disjoint_firsts = sum(item.nullable for item in node.items) <= 1
+        for child in children:
+            if seen & child[2]:
+                disjoint_firsts = False
+            seen |= child[2]
+        ok = ok and (distinct_lengths or disjoint_firsts)
+        length = lengths[0] if None not in lengths and len(set(lengths)) == 1 else None
+        return ok, length, frozenset(seen)
+    if cls is Star:
+        # Words split into fixed-length blocks in one way only
+        item_ok, length, first = children[0]
+        return ok and bool(length), None, first
+    # Power
+    item_ok, length, first = children[0]
+    ok = ok and (node.count <= 1 or length is not None)
+    return ok, None if length is None else length * node.count, first if node.count else frozenset()
+
+
+def _nesting(root):
+    # Depth of the tree, counting only nodes that render as groups
+    depth = {}
+    stack = [root]
+    while stack:
+        node = stack[-1]
+        if node in depth:
+            stack.pop()
+            continue
+        pending = [child for child in node.children() if child not in depth]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        below = max((depth[child] for child in node.children()), default=0)
+        depth[node] = below + (node.__class__ in (Union, Star, Power))
+    return depth[root]
+
+
+def safe_expression(node, automaton=None):
+    """Return an unambiguous expression for the language of node.
+
+    ``automaton`` is called for a DFA of the language when one is needed;
+    by default node is compiled.
+    """
+    if is_unambiguous(node):
+        return node
+    dfa = automaton() if automaton is not None else compile_expression(node)
+    return to_expression(minimize(dfa))
+
+
+def expression_to_python(node, automaton=None):
+    """Return an anchored, backtracking-safe ``re`` pattern for the language
+    of node.
+
+    Raises ValueError when the pattern would be nested too deeply for the
+    ``re`` parser.
+    """
+    node = safe_expression(node, automaton)
+    if _nesting(node) > MAX_NESTING:
+        raise ValueError(f"The pattern would nest more than {MAX_NESTING} groups deep")
+    return r"\A(?:" + render_python(node) + r")\Z"
+
+
+def to_python_regex(strategy, *args):
+    """expression_to_python() for the language of a strategy; its own
+    automaton is used when the expression has to be rebuilt"""
+    return expression_to_python(strategy.build_expression(*args), lambda: strategy.build_automaton(*args))
+
+
+def compile_python(strategy, *args):
+    """Return the compiled pattern of to_python_regex()"""
+    return re.compile(to_python_regex(strategy, *args))
@@ -0,0 +1,500 @@
+"""Typed intermediate representation for generated regular expressions.
+
+Strategies build their result as a tree of the node classes below and the
+renderers turn that tree into text.  Nodes are immutable and hash-consed:
+constructing a node that already exists returns the existing instance, so
+equal subterms such as (a+b) are shared and can be compared with ``is``.
+
+The renderers walk the tree with an explicit stack rather than recursion,
+because the nested forms generated for large N are thousands of levels deep.
+"""
+import itertools
+import threading
+import weakref
+
+# Intern table shared by every node class, keyed by (class, *fields).
+# Entries disappear with the last reference to their node.
+_table = weakref.WeakValueDictionary()
+_lock = threading.Lock()
+_uids = itertools.count()
+
+
+def _store(key, node):
+    node.uid = next(_uids)
+    with _lock:
+        return _table.setdefault(key, node)
+
+
+class Node:
+    """Base class for all expression nodes.
+
+    ``uid`` is unique per distinct node, ``size`` is the number of nodes in
+    the tree (a power counts its operand once) and ``nullable`` tells whether
+    the empty string is in the language.
+    """
+    __slots__ = ("uid", "size", "nullable", "__weakref__")
+
+    def children(self):
+        return ()
+
+    def __reduce__(self):
+        return type(self), self._fields()
+
+    def __str__(self):
+        return render_compact(self)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} #{self.uid} size={self.size}>"
+
+
+class Symbol(Node):
+    __slots__ = ("char",)
+
+    def __new__(cls, char):
+        node = _table.get((cls, char))
+        if node is None:
+            node = object.__new__(cls)
+            node.char = char
+            node.size = 1
+            node.nullable = False
+            node = _store((cls, char), node)
+        return node
+
+    def _fields(self):
+        return (self.char,)
+
+
+class Epsilon(Node):
+    __slots__ = ()
+
+    def __new__(cls):
+        node = _table.get((cls,))
+        if node is None:
+            node = object.__new__(cls)
+            node.size = 1
+            node.nullable = True
+            node = _store((cls,), node)
+        return node
+
+    def _fields(self):
+        return ()
+
+
+class Empty(Node):
+    __slots__ = ()
+
+    def __new__(cls):
+        node = _table.get((cls,))
+        if node is None:
+            node = object.__new__(cls)
+            node.size = 1
+            node.nullable = False
+            node = _store((cls,), node)
+        return node
+
+    def _fields(self):
+        return ()
+
+
+class Concat(Node):
+    __slots__ = ("items",)
+
+    def __new__(cls, *items):
+        if len(items) < 2:
+            raise ValueError("Concat needs at least two operands")
+        key = (cls, items)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.items = items
+            node.size = 1 + sum(item.size for item in items)
+            node.nullable = all(item.nullable for item in items)
+            node = _store(key, node)
+        return node
+
+    def children(self):
+        return self.items
+
+    def _fields(self):
+        return self.items
+
+
+class Union(Node):
+    __slots__ = ("items",)
+
+    def __new__(cls, *items):
+        if len(items) < 2:
+            raise ValueError("Union needs at least two operands")
+        key = (cls, items)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.items = items
+            node.size = 1 + sum(item.size for item in items)
+            node.nullable = any(item.nullable for item in items)
+            node = _store(key, node)
+        return node
+
+    def children(self):
+        return self.items
+
+    def _fields(self):
+        return self.items
+
+
+class Star(Node):
+    __slots__ = ("item",)
+
+    def __new__(cls, item):
+        key = (cls, item)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.item = item
+            node.size = 1 + item.size
+            node.nullable = True
+            node = _store(key, node)
+        return node
+
+    def children(self):
+        return (self.item,)
+
+    def _fields(self):
+        return (self.item,)
+
+
+class Power(Node):
+    """``item`` repeated exactly ``count`` times, written item^{count}"""
+    __slots__ = ("item", "count")
+
+    def __new__(cls, item, count):
+        if count < 0:
+            raise ValueError(f"Cannot repeat an expression {count} times")
+        key = (cls, item, count)
+        node = _table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            node.item = item
+            node.count = count
+            node.size = 1 + item.size
+            node.nullable = count == 0 or item.nullable
+            node = _store(key, node)
+        return node
+
+    def children(self):
+        return (self.item,)
+
+    def _fields(self):
+        return (self.item, self.count)
+
+
+EPSILON = Epsilon()
+EMPTY = Empty()
+ANY_SYMBOL = Union(Symbol("a"), Symbol("b"))
+ANY_STRING = Star(ANY_SYMBOL)
+
+
+# Constructors that apply the obvious identities on the way in
+
+def symbols(text):
+    """Return a tuple of Symbol nodes, one per character of text"""
+    return tuple(Symbol(char) for char in text)
+
+
+def word(text):
+    """Return the expression matching exactly text"""
+    return concat(*symbols(text))
+
+
+def concat(*items):
+    flat = []
+    for item in items:
+        if item is EMPTY:
+            return EMPTY
+        if item is EPSILON:
+            continue
+        if item.__class__ is Concat:
+            flat.extend(item.items)
+        else:
+            flat.append(item)
+    if not flat:
+        return EPSILON
+    if len(flat) == 1:
+        return flat[0]
+    return Concat(*flat)
+
+
+def union(*items):
+    flat = []
+    seen = set()
+    for item in items:
+        for alternative in (item.items if item.__class__ is Union else (item,)):
+            if alternative is EMPTY or alternative in seen:
+                continue
+            seen.add(alternative)
+            flat.append(alternative)
+    if EPSILON in seen:
+        # ε+xx* = ε+x*x = x*
+        for position, alternative in enumerate(flat):
+            if alternative.__class__ is Concat and len(alternative.items) == 2:
+                first, second = alternative.items
+                if second.__class__ is Star and second.item is first:
+                    flat[position] = second
+                elif first.__class__ is Star and first.item is second:
+                    flat[position] = first
+                else:
+                    continue
+                flat.remove(EPSILON)
+                break
+    if not flat:
+        return EMPTY
+    if len(flat) == 1:
+        return flat[0]
+    return Union(*flat)
+
+
+def star(item):
+    if item.__class__ is Union and EPSILON in item.items:
+        # (ε+x)* = x*
+        item = union(*(alternative for alternative in item.items if alternative is not EPSILON))
+    if item is EPSILON or item is EMPTY:
+        return EPSILON
+    if item.__class__ is Star:
+        return item
+    return Star(item)
+
+
+def power(item, count):
+    if count == 0 or item is EPSILON:
+        return EPSILON
+    if item is EMPTY or count == 1:
+        return item
+    return Power(item, count)
+
+
+# Renderers
+
+def _shared_nodes(root, min_size=16):
+    # Nodes reached more than once below root, smallest first.  Their text
+    # does not depend on where they appear, so each is rendered once.
+    seen = set()
+    shared = set()
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            if node.size >= min_size:
+                shared.add(node)
+            continue
+        seen.add(node)
+        stack.extend(node.children())
+    return sorted(shared, key=lambda node: node.size)
+
+
+def _memoised(tokens, root):
+    # Render the shared subterms of root bottom-up, each using the texts of
+    # the smaller ones, then stream root itself
+    memo = {}
+    for node in _shared_nodes(root):
+        memo[node] = "".join(tokens(node, False, memo))
+    return tokens(root, True, memo)
+
+
+def iter_compact(node):
+    """Yield the textbook notation of node in pieces, e.g. ab(a+b)*"""
+    return _memoised(_compact_tokens, node)
+
+
+def _compact_tokens(node, top, memo):
+    stack = [(node, top)]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            yield item
+            continue
+
+        node, top = item
+        if not top and node in memo:
+            yield memo[node]
+            continue
+        cls = node.__class__
+        if cls is Symbol:
+            yield node.char
+        elif cls is Epsilon:
+            yield "ε"
+        elif cls is Empty:
+            yield "∅"
+        elif cls is Concat:
+            stack.extend((child, False) for child in reversed(node.items))
+        elif cls is Union:
+            if not top:
+                stack.append(")")
+            for index in range(len(node.items) - 1, -1, -1):
+                stack.append((node.items[index], False))
+                if index:
+                    stack.append("+")
+            if not top:
+                stack.append("(")
+        else:
+            suffix = "*" if cls is Star else f"^{{{node.count}}}"
+            operand = node.item
+            if operand.__class__ in (Symbol, Epsilon, Empty, Union):
+                stack.extend((suffix, (operand, False)))
+            else:
+                stack.extend((")" + suffix, (operand, False), "("))
+
+
+def iter_formal(node, concat_sep="•", union_sep=" + ", wrap_alternatives=False, expand_powers=False):
+    """Yield the fully parenthesised notation of node in pieces, e.g. (a)•((a)+(b))*
+
+    ``union_sep`` and ``wrap_alternatives`` apply to a union at the top of
+    the expression; nested unions are always written ((x)+(y)), with a
+    concatenation among the alternatives in its own parentheses.  With
+    ``expand_powers`` a power is spelled out as repeated concatenation.
+    """
+    options = (concat_sep, union_sep, wrap_alternatives, expand_powers)
+    return _memoised(lambda node, top, memo: _formal_tokens(node, top, memo, options), node)
+
+
+def _formal_tokens(node, top, memo, options):
+    concat_sep, union_sep, wrap_alternatives, expand_powers = options
+    stack = [(node, top)]
+    while stack:
+        item = stack.pop()
+        if item.__class__ is str:
+            yield item
+            continue
+
+        node, top = item
+        if not top and node in memo:
+            yield memo[node]
+            continue
+        cls = node.__class__
+        if cls is Symbol:
+            yield f"({node.char})"
+        elif cls is Epsilon:
+            yield "ε"
+        elif cls is Empty:
+            yield "∅"
+        elif cls is Concat:
+            for index in range(len(node.items) - 1, -1, -1):
+                child = node.items[index]
+                if child.__class__ is Concat or (expand_powers and child.__class__ is Power and child.count > 1):
+                    stack.extend((")", (child, False), "("))
+                else:
+                    stack.append((child, False))
+                if index:
+                    stack.append(concat_sep)
+        elif cls is Union:
+            separator = union_sep if top else "+"
+            wrap = top and wrap_alternatives
+            if not top:
+                stack.append(")")
+            for index in range(len(node.items) - 1, -1, -1):
+                child = node.items[index]
+                if (wrap or child.__class__ is Concat
+                        or (expand_powers and child.__class__ is Power and child.count > 1)):
+                    stack.extend((")", (child, False), "("))
+                else:
+                    stack.append((child, False))
+                if index:
+                    stack.append(separator)
+            if not top:
+                stack.append("(")
+        elif cls is Power and expand_powers:
+            if node.count == 0:
+                yield "ε"
+                continue
+            # Render the repeated operand once and emit it in blocks
+            text = "".join(_formal_tokens(node.item, False, memo, options))
+            if node.item.__class__ is Concat:
+                text = "(" + text + ")"
+            remaining = node.count
+            while remaining:
+                block = min(remaining, 1024)
+                remaining -= block
+                yield concat_sep.join([text] * block)
+                if remaining:
+                    yield concat_sep
+        else:
+            suffix = "*" if cls is Star else f"^{{{node.count}}}"
+            operand = node.item
+            if operand.__class__ in (Symbol, Union):
+                stack.extend((suffix, (operand, False)))
+            else:
+                stack.extend((")" + suffix, (operand, False), "("))
+
+
+def render_compact(node):
+    return "".join(iter_compact(node))
+
+
+def render_formal(node, **options):
+    return "".join(iter_formal(node, **options))
+
+
+def iter_chunks(tokens, chunk_size=64 * 1024):
+    """Join rendered tokens into strings of about chunk_size characters.
+
+    Tokens longer than chunk_size are split, so no chunk is much larger.
+    """
+    parts = []
+    length = 0
+    for token in tokens:
+        if len(token) > chunk_size:
+            for start in range(0, len(token), chunk_size):
+                parts.append(token[start:start + chunk_size])
+                length += min(chunk_size, len(token) - start)
+                if length >= chunk_size:
+                    yield "".join(parts)
+                    parts = []
+                    length = 0
+            continue
+        parts.append(token)
+        length += len(token)
+        if length >= chunk_size:
+            yield "".join(parts)
+            parts = []
+            length = 0
+    if parts:
+        yield "".join(parts)
+
+
+def iter_python(node):
+    """Yield a literal transcription of node into Python ``re`` syntax.
+
+    The result keeps the nesting of the original expression, so nested stars
+    are passed straight through to the backtracking engine.
+    """
+    from re import escape as re_escape
+
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is str:
+            yield node
+            continue
+
+        cls = node.__class__
+        if cls is Symbol:
+            yield re_escape(node.char)
+        elif cls is Epsilon:
+            yield "(?:)"
+        elif cls is Empty:
+            yield "(?!)"
+        elif cls is Concat:
+            stack.extend(reversed(node.items))
+        elif cls is Union:
+            stack.append(")")
+            for index in range(len(node.items) - 1, -1, -1):
+                stack.append(node.items[index])
+                if index:
+                    stack.append("|")
+            stack.append("(?:")
+        else:
+            suffix = ")*" if cls is Star else f"){{{node.count}}}"
+            stack.extend((suffix, node.item, "(?:"))
+
+
+def render_python(node):
+    return "".join(iter_python(node))
@@ -0,0 +1,84 @@
+"""Bit-parallel (Shift-And) matching for fixed-length patterns of symbol classes.
+
+Languages such as "ends with P" and "the Nth symbol from the last is P",
+(a+b)*P(a+b)^{N-1}, have a small NFA but a DFA of up to 2^N states.  The
+Shift-And algorithm simulates the NFA instead: bit i of a Python integer is
+set while the last i+1 symbols read match the first i+1 classes, and each
+symbol updates every bit at once with
+
+    state = ((state << 1) | 1) & mask[symbol]
+
+That is O(m) bits of memory and O(m / word size) work per symbol for a
+pattern of m classes, whatever N is.
+"""
+import sys
+
+from automata import ALPHABET
+
+
+class ShiftAndMatcher:
+    """Membership test for (a+b)*C1...Cm, or (a+b)*C1...Cm(a+b)* with
+    ``anywhere``, where each class Ci is a string of allowed symbols"""
+    __slots__ = ("length", "masks", "anywhere")
+
+    def __init__(self, classes, anywhere=False):
+        self.length = len(classes)
+        # masks[symbol] has bit i set when class i allows symbol
+        self.masks = [sum(1 << i for i, allowed in enumerate(classes) if char in allowed) for char in ALPHABET]
+        self.anywhere = anywhere
+
+    @property
+    def num_bits(self):
+        return self.length
+
+    def memory_size(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.masks) + sum(map(sys.getsizeof, self.masks))
+
+    def matches(self, word):
+        """Return True if word is in the language, in O(len(word) * m / 64)
+        time, or O(m * m / 64) when the match must end the word"""
+        if word.strip(ALPHABET):
+            return False  # Symbols outside {a, b}
+        m = self.length
+        if m == 0:
+            return True
+        if not self.anywhere:
+            # Whether a match ends the word depends on its last m symbols only
+            if len(word) < m:
+                return False
+            word = word[-m:]
+
+        masks = self.masks
+        final = 1 << (m - 1)
+        state = 0
+        if self.anywhere:
+            for code in word.encode("ascii"):
+                state = ((state << 1) | 1) & masks[code - 97]
+                if state & final:
+                    return True
+            return False
+        for code in word.encode("ascii"):
+            state = ((state << 1) | 1) & masks[code - 97]
+        return bool(state & final)
+
+    def match_many(self, words):
+        """Return a list with the result of matches() for each word"""
+        return [self.matches(word) for word in words]
+
+    def __repr__(self):
+        return f"<ShiftAndMatcher bits={self.length} anywhere={self.anywhere}>"
+
+
+def contains_matcher(pattern):
+    """Matcher for the words that contain pattern"""
+    return ShiftAndMatcher(list(pattern), anywhere=True)
+
+
+def ends_with_matcher(pattern):
+    """Matcher for the words that end with pattern"""
+    return ShiftAndMatcher(list(pattern))
+
+
+def nth_from_last_matcher(pattern, N):
+    """Matcher for (a+b)*P(a+b)^{N-1}: pattern starts N symbols from the end"""
+    return ShiftAndMatcher(list(pattern) + [ALPHABET] * (N - 1))
@@ -0,0 +1,145 @@
+"""Algebraic simplification of regex_ast expressions.
+
+simplify() rewrites an expression bottom-up into a smaller equivalent one.
+Each distinct node is rewritten once, after its children, so the pass is
+linear in the number of distinct nodes times their arity even when the
+tree shares subterms heavily.  No rule makes an expression larger and each
+node goes through a fixed sequence of rules, so the pass always terminates.
+
+The rules, on top of the identities the regex_ast constructors already
+apply (εx = x, ∅x = ∅, ∅+x = x, x+x = x, (x*)* = x*, (ε+x)* = x*, ...):
+
+    nested concatenations and unions are flattened
+    x•...•x = x^{k}, x^{j}•x^{k} = x^{j+k}, x*•x* = x*
+    a whole concatenation that repeats a block, (ab)•...•(ab) = (ab)^{k}
+
+Runs are only folded into a power when that is shorter to write, so bb
+stays bb while a run of ten b's becomes b^{10}.
+    (x*)^{k} = x*, (x^{j})^{k} = x^{jk}
+    x + x* = x*, y + (x+y)* = (x+y)*, ε + x = x for nullable x
+    (x* + y)* = (x + y)*, (x*y*)* = (x + y)* when every factor is nullable
+"""
+from automata import failure_function
+from regex_ast import EPSILON, Concat, Power, Star, Symbol, Union, concat, power, star, union
+from tasks import checkpoint
+
+
+def simplify(root):
+    """Return an expression for the same language as root, usually smaller"""
+    memo = {}
+    stack = [root]
+    steps = 0
+    while stack:
+        node = stack[-1]
+        if node in memo:
+            stack.pop()
+            continue
+        pending = [child for child in node.children() if child not in memo]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+
+        steps += 1
+        if not steps % 4096:
+            checkpoint()
+        cls = node.__class__
+        if cls is Concat:
+            memo[node] = _concat([memo[child] for child in node.items])
+        elif cls is Union:
+            memo[node] = _union([memo[child] for child in node.items])
+        elif cls is Star:
+            memo[node] = _star(memo[node.item])
+        elif cls is Power:
+            memo[node] = _power(memo[node.item], node.count)
+        else:
+            memo[node] = node
+    return memo[root]
+
+
+def _base(node):
+    # (operand, repetitions) with a power counting as its operand repeated
+    if node.__class__ is Power:
+        return node.item, node.count
+    return node, 1
+
+
+def _concat(items):
+    node = concat(*items)
+    if node.__class__ is not Concat:
+        return node
+
+    # Merge runs of the same factor into one power
+    runs = []
+    for item in node.items:
+        base, count = _base(item)
+        if runs and runs[-1][0] is base:
+            if base.__class__ is not Star:  # x*•x* = x*
+                runs[-1][1] += count
+                runs[-1][2] = runs[-1][2] or item.__class__ is Power
+        else:
+            runs.append([base, count, item.__class__ is Power])
+    items = []
+    for base, count, has_power in runs:
+        if has_power or count == 1 or _worth_folding(base, base.size, count):
+            items.append(_power(base, count))
+        else:
+            items.extend([base] * count)
+
+    # The smallest period of the factor sequence, from its KMP border
+    n = len(items)
+    period = n - failure_function(items)[n]
+    if period < n and not n % period:
+        block = concat(*items[:period])
+        if _worth_folding(block, block.size - 1, n // period):
+            return _power(block, n // period)
+    return concat(*items)
+
+
+def _worth_folding(item, length, count):
+    # Whether item^{count} is shorter to write than count copies of item,
+    # taking the size of item as its written length.  Short runs such as bb
+    # stay as they are.
+    overhead = 3 + len(str(count)) + (0 if item.__class__ in (Symbol, Union) else 2)
+    return (count - 1) * length > overhead
+
+
+def _union(items):
+    node = union(*items)
+    if node.__class__ is not Union:
+        return node
+
+    # Alternatives already inside a starred alternative add nothing
+    covered = set()
+    for alternative in node.items:
+        if alternative.__class__ is Star:
+            operand = alternative.item
+            covered.add(operand)
+            if operand.__class__ is Union:
+                covered.update(operand.items)
+    nullable = any(alternative.nullable and alternative is not EPSILON for alternative in node.items)
+    kept = [alternative for alternative in node.items
+            if alternative not in covered and not (alternative is EPSILON and nullable)]
+    if len(kept) == len(node.items):
+        return node
+    return union(*kept)
+
+
+def _star(item):
+    if item.__class__ is Concat and all(factor.nullable for factor in item.items):
+        # Each factor can be skipped, so any factor may follow any other
+        item = _union(list(item.items))
+    if item.__class__ is Union and any(alternative.__class__ is Star for alternative in item.items):
+        item = _union([alternative.item if alternative.__class__ is Star else alternative
+                       for alternative in item.items])
+    elif item.__class__ is Star:
+        return item
+    return star(item)
+
+
+def _power(item, count):
+    if item.__class__ is Star and count >= 1:
+        return item
+    if item.__class__ is Power:
+        return power(item.item, item.count * count)
+    return power(item, count)
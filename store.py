@@ -0,0 +1,167 @@
+"""Persistent result store shared across sessions and processes.
+
+Generated expressions and compiled automata are kept in a SQLite database
+so that a later run, or another worker process, can reuse them.  Rows are
+keyed by the cache key and the model version, so results from an older
+model are never returned.  The database runs in WAL mode, which lets any
+number of processes read while one writes; each thread and process opens
+its own connection.  When the stored values exceed ``max_bytes`` the least
+recently used rows are deleted.  Reads do not write: the times rows were
+last used are collected and written in one batch at most every
+``touch_interval`` seconds, and before compacting.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (key, version)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def default_path():
+    """Location of the store used by the GUI: the file REGEX_GENERATOR_STORE
+    names, or with REGEX_GENERATOR_STORE=default one under the user's cache
+    directory.  None, and no store, when it is unset."""
+    path = os.environ.get("REGEX_GENERATOR_STORE")
+    if path != "default":
+        return path or None
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "regex-generator", "results.sqlite3")
+
+
+class ResultStore:
+    # Values that took less time than this to compute are not worth a write
+    min_compute_seconds = 0.005
+    # Seconds between writes of the last-used times of rows read since
+    touch_interval = 60.0
+
+    def __init__(self, path, version, max_bytes=256 * 1024 * 1024, timeout=10.0):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        # repr(key) -> time of the latest read not yet written
+        self._touched = {}
+        self._touch_lock = threading.Lock()
+        self._flushed = time.monotonic()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self):
+        # One connection per thread and per process (a connection must not
+        # cross a fork)
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def get(self, key):
+        """Return the stored value for key, or None"""
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT value FROM results WHERE key = ? AND version = ?",
+                                     (repr(key), self.version)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                value = pickle.loads(row[0])
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+                # A corrupt blob, or one whose class no longer loads, is dropped
+                self.misses += 1
+                connection.execute("DELETE FROM results WHERE key = ? AND version = ?",
+                                   (repr(key), self.version))
+                return None
+            with self._touch_lock:
+                self._touched[repr(key)] = time.time()
+                due = time.monotonic() - self._flushed >= self.touch_interval
+            if due:
+                self.flush()
+        except sqlite3.Error:
+            # A busy or broken store only costs a recomputation
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value under key, then compact if over the size cap"""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes // 4:
+            return
+        try:
+            connection = self._connection()
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                               (repr(key), self.version, blob, len(blob), time.time()))
+            if self.total_bytes() > self.max_bytes:
+                self.compact()
+        except sqlite3.Error:
+            pass
+
+    def flush(self):
+        """Write the last-used times of the rows read since the last flush"""
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+            self._flushed = time.monotonic()
+        if touched:
+            self._connection().executemany(
+                "UPDATE results SET last_used = ? WHERE key = ? AND version = ?",
+                [(used, key, self.version) for key, used in touched.items()])
+
+    def total_bytes(self):
+        return self._connection().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def compact(self, target=None):
+        """Delete rows from other model versions, then the least recently used
+        rows until the store is under target bytes (default 90% of the cap)"""
+        if target is None:
+            target = self.max_bytes * 9 // 10
+        self.flush()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM results WHERE version != ?", (self.version,))
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            rows = connection.execute("SELECT key, version, size FROM results ORDER BY last_used")
+            doomed = []
+            for key, version, size in rows:
+                if total <= target:
+                    break
+                doomed.append((key, version))
+                total -= size
+            connection.executemany("DELETE FROM results WHERE key = ? AND version = ?", doomed)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connection().execute("DELETE FROM results")
+
+    def close(self):
+        try:
+            self.flush()
+        except sqlite3.Error:
+            pass
+        if getattr(self._local, "pid", None) == os.getpid():
+            self._local.connection.close()
+            del self._local.pid
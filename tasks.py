@@ -0,0 +1,73 @@
+"""Cooperative cancellation and progress reporting for long generations.
+
+A Task runs a function on the calling thread and makes itself the current
+task of that thread for the duration.  Long loops in the model, renderers
+and automata call checkpoint() now and then: it raises GenerationCancelled
+once the task has been cancelled from another thread, and forwards
+progress to the task's callback.  Outside a task checkpoint() does nothing,
+so headless callers pay only a thread-local lookup.
+
+Nothing here depends on Qt; the GUI wraps a Task in a QRunnable.
+"""
+import threading
+
+_local = threading.local()
+
+
+class GenerationCancelled(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, progress=None):
+        # progress(done, total) is called from the worker thread, at most
+        # once per percent
+        self.progress = progress
+        self._cancelled = threading.Event()
+        self._percent = -1
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Ask the running function to stop at its next checkpoint"""
+        self._cancelled.set()
+
+    def run(self, function, *args, **kwargs):
+        previous = getattr(_local, "task", None)
+        _local.task = self
+        try:
+            checkpoint()
+            return function(*args, **kwargs)
+        finally:
+            _local.task = previous
+
+    def report(self, done, total):
+        percent = done * 100 // total
+        if self.progress is not None and percent != self._percent:
+            self._percent = percent
+            self.progress(done, total)
+
+
+def checkpoint(done=None, total=None):
+    """Raise GenerationCancelled if the current task was cancelled, and
+    report done out of total steps when both are given"""
+    task = getattr(_local, "task", None)
+    if task is None:
+        return
+    if task._cancelled.is_set():
+        raise GenerationCancelled()
+    if total:
+        task.report(done, total)
+
+
+def checked(tokens, every=4096):
+    """Pass tokens through, calling checkpoint() once every ``every`` tokens"""
+    if getattr(_local, "task", None) is None:
+        yield from tokens
+        return
+    for count, token in enumerate(tokens):
+        if not count % every:
+            checkpoint()
+        yield token
@@ -0,0 +1,101 @@
+"""Batch DFA simulation with NumPy.
+
+Words are packed into a matrix with one row per word and one column per
+position, and every row is stepped through the DFA's transition table
+together, one column at a time.  The result is a boolean mask with one
+entry per word.  Needs NumPy, which the rest of the project does not.
+
+Symbol codes in a packed matrix: 0 for 'a', 1 for 'b', 2 for padding past
+the end of a word and 3 for anything else (the word is then rejected).
+"""
+import numpy as np
+
+A, B, PAD, INVALID = 0, 1, 2, 3
+
+# Byte value -> symbol code, for packing ASCII text
+_CODES = np.full(256, INVALID, dtype=np.uint8)
+_CODES[ord("a")] = A
+_CODES[ord("b")] = B
+
+
+def pack_words(words):
+    """Pack an iterable of strings into (symbols, lengths).
+
+    ``symbols`` is a uint8 matrix of shape (len(words), longest length)
+    padded with PAD, ``lengths`` an int64 vector of word lengths.
+    """
+    encoded = [word.encode("ascii", "replace") for word in words]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    width = int(lengths.max()) if len(encoded) else 0
+    symbols = np.full((len(encoded), width), PAD, dtype=np.uint8)
+    if width:
+        codes = _CODES[np.frombuffer(b"".join(encoded), dtype=np.uint8)]
+        rows = np.repeat(np.arange(len(encoded)), lengths)
+        starts = np.cumsum(lengths) - lengths
+        columns = np.arange(len(codes)) - np.repeat(starts, lengths)
+        symbols[rows, columns] = codes
+    return symbols, lengths
+
+
+def pack_bits(symbols, lengths):
+    """Bit-pack a symbol matrix from pack_words (a=0, b=1, eight per byte).
+
+    Only valid for matrices without INVALID codes; padding packs as 0 and
+    is ignored again using ``lengths``.
+    """
+    if (symbols == INVALID).any():
+        raise ValueError("Only words over {a, b} can be bit-packed")
+    return np.packbits(symbols == B, axis=1)
+
+
+def _stepping_table(dfa):
+    # One row per state plus a rejecting sink; columns a, b, pad (stay put)
+    # and invalid (go to the sink)
+    states = dfa.num_states
+    table = np.empty((states + 1, 4), dtype=np.int64)
+    table[:states, :2] = np.asarray(dfa.table, dtype=np.int64).reshape(states, 2)
+    table[:, PAD] = np.arange(states + 1)
+    table[:, INVALID] = states
+    table[states, :2] = states
+    accepting = np.zeros(states + 1, dtype=bool)
+    accepting[:states] = np.frombuffer(bytes(dfa.accepting), dtype=np.uint8) == 1
+    return table, accepting
+
+
+def _state_dtype(dfa):
+    return np.int16 if dfa.num_states < 2 ** 15 - 1 else np.int32
+
+
+def match_packed(dfa, symbols, lengths=None):
+    """Return a boolean mask of the rows of a packed symbol matrix that the
+    DFA accepts.  ``lengths`` is not needed, padding is part of the matrix."""
+    table, accepting = _stepping_table(dfa)
+    table = table.astype(_state_dtype(dfa))
+    states = np.full(symbols.shape[0], dfa.start, dtype=table.dtype)
+    for column in range(symbols.shape[1]):
+        states = table[states, symbols[:, column]]
+    return accepting[states]
+
+
+def match_bits(dfa, bits, lengths):
+    """Return a boolean mask of the bit-packed words (see pack_bits) with the
+    given lengths that the DFA accepts."""
+    table, accepting = _stepping_table(dfa)
+    table = table.astype(_state_dtype(dfa))
+    lengths = np.asarray(lengths)
+    states = np.full(bits.shape[0], dfa.start, dtype=table.dtype)
+    width = int(lengths.max()) if len(lengths) else 0
+    for byte_column in range((width + 7) // 8):
+        # Unpack eight positions at a time and mark those past the end
+        block = np.unpackbits(bits[:, byte_column:byte_column + 1], axis=1)
+        positions = np.arange(8 * byte_column, 8 * byte_column + 8)
+        block[positions >= lengths[:, None]] = PAD
+        for offset in range(8):
+            states = table[states, block[:, offset]]
+    return accepting[states]
+
+
+def match_words(dfa, words):
+    """Pack words and return the boolean mask of those the DFA accepts"""
+    symbols, lengths = pack_words(words)
+    return match_packed(dfa, symbols, lengths)
@@ -1,8 +1,9 @@
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QTextEdit, QPushButton,
-                             QGroupBox, QComboBox, QSpinBox, QStackedWidget)
+                             QGroupBox, QComboBox, QSpinBox, QStackedWidget, QProgressBar,
+                             QCheckBox, QPlainTextEdit, QFileDialog)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QIcon
+from PyQt5.QtGui import QFont, QIcon, QTextCursor
 
 
 class RegexView(QMainWindow):
@@ -85,6 +86,11 @@ class RegexView(QMainWindow):
         # Multiple patterns input
         multi_pattern_widget = QWidget()
         multi_pattern_layout = QVBoxLayout(multi_pattern_widget)
+        # The strategy above takes one P; here each clause gets its own pattern
+        composition_label = QLabel('Generates the words that contain P1 and start and/or end with P2, '
+                                   'as the selected pattern says (P1 = P2 gives the language above), '
+                                   'combined with a clause on P3 if it is given.')
+        composition_label.setWordWrap(True)
         pattern1_label = QLabel('Enter pattern P1 (using a and b characters):')
         self.pattern_input_p1 = QLineEdit()
         self.pattern_input_p1.setPlaceholderText('Enter first pattern')
@@ -94,12 +100,20 @@ class RegexView(QMainWindow):
         pattern3_label = QLabel('Enter pattern P3 (using a and b characters):')
         self.pattern_input_p3 = QLineEdit()
         self.pattern_input_p3.setPlaceholderText('Enter third pattern (optional)')
+        combine_label = QLabel('Combine with P3:')
+        self.combine_combo = QComboBox()
+        self.combine_combo.addItem('and contains P3', 'and')
+        self.combine_combo.addItem('or contains P3', 'or')
+        self.combine_combo.addItem('but does not contain P3', 'but not')
+        multi_pattern_layout.addWidget(composition_label)
         multi_pattern_layout.addWidget(pattern1_label)
         multi_pattern_layout.addWidget(self.pattern_input_p1)
         multi_pattern_layout.addWidget(pattern2_label)
         multi_pattern_layout.addWidget(self.pattern_input_p2)
         multi_pattern_layout.addWidget(pattern3_label)
         multi_pattern_layout.addWidget(self.pattern_input_p3)
+        multi_pattern_layout.addWidget(combine_label)
+        multi_pattern_layout.addWidget(self.combine_combo)
         self.stacked_inputs.addWidget(multi_pattern_widget)
 
         input_layout.addWidget(self.stacked_inputs)
@@ -108,17 +122,51 @@ class RegexView(QMainWindow):
         button_layout = QHBoxLayout()
         self.generate_button = QPushButton('Generate Regular Expression')
         self.clear_button = QPushButton('Clear')
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.setEnabled(False)
         button_layout.addWidget(self.generate_button)
         button_layout.addWidget(self.clear_button)
+        button_layout.addWidget(self.cancel_button)
         input_layout.addLayout(button_layout)
 
+        self.live_preview_checkbox = QCheckBox('Live preview (regenerate while typing)')
+        input_layout.addWidget(self.live_preview_checkbox)
+        self.preview_note_label = QLabel()
+        self.preview_note_label.setVisible(False)
+        input_layout.addWidget(self.preview_note_label)
+
+        # Shown while a generation runs in the background
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        input_layout.addWidget(self.progress_bar)
+
         # Results section
         results_group = QGroupBox('Generated Regular Expression')
         results_layout = QVBoxLayout(results_group)
         self.results_display = QTextEdit()
         self.results_display.setReadOnly(True)
+        self.results_display.setMaximumHeight(110)
         results_layout.addWidget(self.results_display)
 
+        # The expression itself, as plain text and only a page at a time;
+        # large results are megabytes long
+        self.regex_display = QPlainTextEdit()
+        self.regex_display.setReadOnly(True)
+        self.regex_display.setFont(QFont('Courier New', 11))
+        results_layout.addWidget(self.regex_display)
+
+        result_actions_layout = QHBoxLayout()
+        self.result_stats_label = QLabel()
+        self.show_more_button = QPushButton('Show More')
+        self.copy_all_button = QPushButton('Copy All')
+        self.save_button = QPushButton('Save to File...')
+        result_actions_layout.addWidget(self.result_stats_label, 1)
+        result_actions_layout.addWidget(self.show_more_button)
+        result_actions_layout.addWidget(self.copy_all_button)
+        result_actions_layout.addWidget(self.save_button)
+        results_layout.addLayout(result_actions_layout)
+        self.set_result_actions_enabled(False, False)
+
         # Explanation section
         explanation_group = QGroupBox('How It Works')
         explanation_layout = QVBoxLayout(explanation_group)
@@ -142,15 +190,59 @@ class RegexView(QMainWindow):
     def set_results(self, text):
         self.results_display.setHtml(text)
 
+    def set_regex_page(self, text, append=False):
+        if append:
+            # Insert at the end without starting a new paragraph
+            cursor = self.regex_display.textCursor()
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+        else:
+            self.regex_display.setPlainText(text)
+
+    def set_result_stats(self, text):
+        self.result_stats_label.setText(text)
+
+    def set_result_actions_enabled(self, has_result, has_more):
+        self.show_more_button.setEnabled(has_more)
+        self.copy_all_button.setEnabled(has_result)
+        self.save_button.setEnabled(has_result)
+
+    def get_save_path(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Save Regular Expression', 'regex.txt',
+                                              'Text files (*.txt);;All files (*)')
+        return path
+
+    def set_busy(self, busy):
+        self.cancel_button.setEnabled(busy)
+        self.progress_bar.setVisible(busy)
+        if busy:
+            # Indeterminate until the first progress report arrives
+            self.progress_bar.setRange(0, 0)
+
+    def set_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def is_live_preview(self):
+        return self.live_preview_checkbox.isChecked()
+
+    def set_preview_note(self, text):
+        self.preview_note_label.setText(text)
+        self.preview_note_label.setVisible(bool(text))
+
     def clear_inputs(self):
         self.pattern_input.clear()
         self.pattern_input2.clear()
         self.pattern_input_p1.clear()
         self.pattern_input_p2.clear()
         self.pattern_input_p3.clear()
+        self.combine_combo.setCurrentIndex(0)
         self.number_input.setValue(2)
         self.number_input2.setValue(2)
         self.results_display.clear()
+        self.regex_display.clear()
+        self.result_stats_label.clear()
+        self.set_result_actions_enabled(False, False)
 
     def set_input_widget(self, index):
         self.stacked_inputs.setCurrentIndex(index)
@@ -189,6 +281,9 @@ class RegexView(QMainWindow):
     def get_pattern_input_p3(self):
         return self.pattern_input_p3.text()
 
+    def get_combine_operation(self):
+        return self.combine_combo.currentData()
+
     def set_pattern_input(self, text):
         self.pattern_input.setText(text)
 
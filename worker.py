@@ -0,0 +1,40 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from tasks import GenerationCancelled, Task
+
+
+class WorkerSignals(QObject):
+    # Every signal carries the generation number the worker was started
+    # with, so the controller can ignore workers that have been superseded
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+    progress = pyqtSignal(int, int, int)
+
+
+class GenerationWorker(QRunnable):
+    """Runs function(*args) on a QThreadPool thread inside a tasks.Task"""
+
+    def __init__(self, generation, function, *args):
+        super().__init__()
+        self.generation = generation
+        self.function = function
+        self.args = args
+        self.signals = WorkerSignals()
+        self.task = Task(progress=self.report_progress)
+
+    def report_progress(self, done, total):
+        self.signals.progress.emit(self.generation, done, total)
+
+    def cancel(self):
+        self.task.cancel()
+
+    def run(self):
+        try:
+            result = self.task.run(self.function, *self.args)
+        except GenerationCancelled:
+            self.signals.cancelled.emit(self.generation)
+        except Exception as error:
+            self.signals.failed.emit(self.generation, str(error))
+        else:
+            self.signals.finished.emit(self.generation, result)